@@ -1,11 +1,23 @@
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+from pymongo import WriteConcern
 
 from .DatabaseManager import get_collection
 
 logger = logging.getLogger(__name__)
 
+# How long a user's opt-out status is reused before being re-read from MongoDB
+OPT_OUT_CACHE_TTL_SECONDS = 60
+
+# The opt-out cache is dropped once it holds this many users
+OPT_OUT_CACHE_MAX_SIZE = 10_000
+
+# Opt-out/opt-in flag writes only need the primary's acknowledgement
+OPT_OUT_WRITE_CONCERN = WriteConcern(w=1)
+
 
 class EconDataManager:
     """
@@ -15,6 +27,8 @@ class EconDataManager:
 
     def __init__(self, db_manager_instance):
         self.db = db_manager_instance
+        # (user_id, guild_id) -> (expires_at, opted_out), expiry on the monotonic clock
+        self._opt_out_cache: Dict[Tuple[str, str], Tuple[float, bool]] = {}
 
     # --- Collection Getters ---
 
@@ -23,6 +37,11 @@ class EconDataManager:
         # Collection to store user-specific settings like opt-out status
         return get_collection("Users", "Settings")
 
+    @property
+    def user_settings_write_collection(self):
+        # User settings collection with OPT_OUT_WRITE_CONCERN, for opt-out/opt-in flag writes
+        return self.user_settings_collection.with_options(write_concern=OPT_OUT_WRITE_CONCERN)
+
     @property
     def user_stats_collection(self):
         return get_collection("Users", "Stats")
@@ -46,10 +65,34 @@ class EconDataManager:
     async def get_user_opt_out_status(self, user_id: str, guild_id: str) -> bool:
         """
         Checks if a user has opted out in a specific guild.
+        Results are cached for OPT_OUT_CACHE_TTL_SECONDS; the opt-out, opt-in and
+        deletion methods below drop the affected entries.
         """
+        key = (user_id, guild_id)
+        now = time.monotonic()
+        cached = self._opt_out_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
         query = {"user_id": user_id, "guild_id": guild_id}
         settings = await self.user_settings_collection.find_one(query)
-        return settings.get("opted_out", False) if settings else False
+        opted_out = settings.get("opted_out", False) if settings else False
+
+        if len(self._opt_out_cache) >= OPT_OUT_CACHE_MAX_SIZE:
+            self._opt_out_cache.clear()
+        self._opt_out_cache[key] = (now + OPT_OUT_CACHE_TTL_SECONDS, opted_out)
+        return opted_out
+
+    def invalidate_opt_out_status(self, user_id: Optional[str] = None, guild_id: Optional[str] = None):
+        """
+        Drops cached opt-out statuses for a user in a guild, a user across all
+        guilds, or every user in a guild.
+        """
+        if user_id and guild_id:
+            self._opt_out_cache.pop((user_id, guild_id), None)
+            return
+        for key in [k for k in self._opt_out_cache if k[0] == user_id or k[1] == guild_id]:
+            del self._opt_out_cache[key]
 
     async def set_user_opt_out(self, user_id: str, guild_id: str, retain_data: bool):
         """
@@ -70,11 +113,12 @@ class EconDataManager:
             await self.delete_all_user_data(user_id=user_id, guild_id=guild_id)
             logger.info(f"User {user_id} opted out in {guild_id} and requested immediate data deletion.")
 
-        await self.user_settings_collection.update_one(
+        await self.user_settings_write_collection.update_one(
             {"user_id": user_id, "guild_id": guild_id},
             {"$set": update_data},
             upsert=True
         )
+        self.invalidate_opt_out_status(user_id, guild_id)
 
     async def set_user_opt_in(self, user_id: str, guild_id: str):
         """
@@ -89,11 +133,12 @@ class EconDataManager:
                 "data_deletion_date": ""
             }
         }
-        await self.user_settings_collection.update_one(
+        await self.user_settings_write_collection.update_one(
             {"user_id": user_id, "guild_id": guild_id},
             update_data,
             upsert=True
         )
+        self.invalidate_opt_out_status(user_id, guild_id)
         logger.info(f"User {user_id} opted back into the system in guild {guild_id}.")
 
     # --- Data Deletion ('Nuke') Operations ---
@@ -122,7 +167,8 @@ class EconDataManager:
                 logger.info(f"Deleted {result.deleted_count} documents from {collection.database.name}.{collection.name} for user {user_id}.")
             else:
                 logger.warning(f"Could not get a collection to clean for user {user_id}.")
-        
+
+        self.invalidate_opt_out_status(user_id, guild_id)
         await self._delete_local_user_activity(user_id, guild_id)
 
 
@@ -147,7 +193,8 @@ class EconDataManager:
                 logger.info(f"Deleted {result.deleted_count} documents from {collection.database.name}.{collection.name} for guild {guild_id}.")
             else:
                  logger.warning(f"Could not get a collection to clean for guild {guild_id}.")
-        
+
+        self.invalidate_opt_out_status(guild_id=guild_id)
         await self._delete_local_user_activity(guild_id=guild_id)
 
     async def _delete_local_user_activity(self, user_id: Optional[str] = None, guild_id: Optional[str] = None):
@@ -7,7 +7,7 @@ import logging
 logger = logging.getLogger("VoiceSession")
 
 
-@dataclass
+@dataclass(slots=True)
 class VoiceSession:
     """
     Represents and tracks an individual user's voice session with detailed analytics.
@@ -16,6 +16,9 @@ class VoiceSession:
     including start and end times, various states (muted, deafened, streaming, etc.),
     and the time spent in each state. It provides methods to compute detailed
     metrics about the session, such as active time and engagement score.
+
+    All timestamps are time.monotonic() seconds: they are only ever used as
+    differences, and the monotonic clock can't jump when NTP adjusts the wall clock.
     """
     start_time: float
     session_id: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -44,7 +47,7 @@ class VoiceSession:
 
     def __post_init__(self):
         """Initialize session with validation and default values."""
-        current_time = time.time()
+        current_time = time.monotonic()
 
         # Validate start time isn't in the future
         if self.start_time > current_time:
@@ -169,7 +172,7 @@ class VoiceSession:
         Capture current state durations without updating timestamps.
         Useful for periodic sampling without modifying state.
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         return {
             "total_duration": self.total_duration(current_time),
             "active_duration": self.active_duration(current_time),
@@ -289,7 +292,7 @@ class VoiceSession:
         Reset session durations and states while preserving session ID.
         Useful for handling channel moves without creating new sessions.
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         self.start_time = new_start_time or current_time
         self.last_state_change = self.start_time
         self.last_update_time = self.start_time
@@ -302,6 +305,43 @@ class VoiceSession:
 
         logger.debug(f"🔄 VoiceSession reset: {self.session_id}")
 
+    def reinit(
+            self,
+            start_time: float,
+            channel_id: Optional[str] = None,
+            participant_count: int = 0,
+            is_muted: bool = False,
+            is_deafened: bool = False,
+            is_self_muted: bool = False,
+            is_self_deafened: bool = False,
+            is_streaming: bool = False,
+            is_video: bool = False,
+    ) -> None:
+        """
+        Re-populate a finished session as a brand-new one, taking the same
+        arguments as the constructor. Used when recycling pooled sessions.
+        """
+        self.start_time = start_time
+        self.session_id = str(uuid.uuid4())
+        self.channel_id = channel_id
+        self.participant_count = participant_count
+
+        self.is_muted = is_muted
+        self.is_deafened = is_deafened
+        self.is_self_muted = is_self_muted
+        self.is_self_deafened = is_self_deafened
+        self.is_streaming = is_streaming
+        self.is_video = is_video
+
+        self.muted_time = 0.0
+        self.deafened_time = 0.0
+        self.self_muted_time = 0.0
+        self.self_deafened_time = 0.0
+        self.streaming_time = 0.0
+        self.video_time = 0.0
+
+        self.__post_init__()
+
     def _get_state_description(self) -> str:
         """Get human-readable description of current voice state."""
         states = []
@@ -316,7 +356,7 @@ class VoiceSession:
 
     def __str__(self) -> str:
         """Human-readable string representation."""
-        current_time = time.time()
+        current_time = time.monotonic()
         duration = self.total_duration(current_time)
         active = self.active_duration(current_time)
 
@@ -329,4 +369,4 @@ class VoiceSession:
         return (f"VoiceSession(session_id='{self.session_id}', "
                 f"start_time={self.start_time}, "
                 f"is_active={self.is_active()}, "
-                f"duration={self.total_duration(time.time()):.1f}s)")
\ No newline at end of file
+                f"duration={self.total_duration(time.monotonic()):.1f}s)")
\ No newline at end of file
@@ -4,8 +4,34 @@ import logging
 import discord
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime, timezone, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from database.DatabaseManager import DatabaseManager, get_collection, DatabaseOperationError
 
+# Fields read for batched summaries (load_user_activity_summary); enough for the
+# /activity embed's pattern breakdowns and activity total
+SUMMARY_PROJECTION = {"user_id": 1, "activity_patterns": 1, "activity_summary.total_activities": 1}
+
+# Pattern migration updates are sent to MongoDB in bulk_write batches of this size
+MIGRATION_BATCH_SIZE = 1000
+
+# Documents fetched per round trip by full-collection and guild-wide scans; their
+# projections keep each batch far below MongoDB's 16 MiB reply limit
+SCAN_BATCH_SIZE = 2000
+
+# Time-of-day period for each hour 0-23 (see categorize_hour_to_time_of_day)
+_HOUR_TO_PERIOD = (
+    ("night",) * 2            # 0-1
+    + ("overnight",) * 4      # 2-5
+    + ("morning",) * 6        # 6-11
+    + ("afternoon",) * 6      # 12-17
+    + ("evening",) * 5        # 18-22
+    + ("night",)              # 23
+)
+
+# Weekday category for each day 0-6 (0=Monday)
+_WEEKDAY_TO_CATEGORY = ("weekday",) * 5 + ("weekend",) * 2
+
 
 class ActivitySystem:
     """
@@ -39,6 +65,15 @@ class ActivitySystem:
         self._guild_cache = {}
         self._cache_timeout = 300  # 5 minutes
 
+        # Summary requests waiting for the next batched read: guild_id -> {user_id: Future}
+        self._pending_summaries: Dict[str, Dict[str, asyncio.Future]] = {}
+        self._summary_batch_window = 0.005  # 5 ms
+        self._summary_batch_tasks = set()
+        # In-flight and recently read summaries: (guild_id, user_id) -> Future, so repeat
+        # requests share one read; found summaries are kept for _summary_ttl seconds
+        self._summary_futures: Dict[tuple, asyncio.Future] = {}
+        self._summary_ttl = 10
+
     async def initialize(self):
         """
         Initializes the system by getting the collection and ensuring indexes are created.
@@ -436,6 +471,81 @@ class ActivitySystem:
             self.logger.error(f"❌ Error getting user activity summary: {e}", exc_info=True)
             return None
 
+    async def get_user_activity_summaries_bulk(self, user_ids: List[str], guild_id: str,
+                                               projection: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get activity summaries for several users in a guild with a single query.
+
+        Args:
+            user_ids: Users to read
+            guild_id: Guild ID
+            projection: Optional MongoDB projection; must include user_id
+
+        Returns:
+            Mapping of user_id to enhanced summary; users without activity data are omitted
+        """
+        try:
+            summaries = {}
+            cursor = self.collection.find({"guild_id": guild_id, "user_id": {"$in": list(user_ids)}}, projection)
+            async for user_activity in cursor:
+                summaries[user_activity["user_id"]] = await self._enhance_user_summary(user_activity)
+            return summaries
+
+        except Exception as e:
+            self.logger.error(f"❌ Error getting bulk user activity summaries: {e}", exc_info=True)
+            return {}
+
+    async def load_user_activity_summary(self, user_id: str, guild_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a user's activity summary, batching concurrent requests.
+
+        Only the SUMMARY_PROJECTION fields are read; use get_user_activity_summary()
+        for the full document. Requests for the same guild that arrive within the
+        batch window are served by one get_user_activity_summaries_bulk() query.
+        A request for a user whose summary is already being read, or was read in
+        the last _summary_ttl seconds, shares that result.
+        """
+        key = (guild_id, user_id)
+        future = self._summary_futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            pending = self._pending_summaries.get(guild_id)
+            if pending is None:
+                pending = self._pending_summaries[guild_id] = {}
+                loop.call_later(self._summary_batch_window, self._flush_summary_batch, guild_id)
+            future = pending[user_id] = self._summary_futures[key] = loop.create_future()
+
+        # Shielded so one cancelled caller doesn't cancel the result for the others
+        return await asyncio.shield(future)
+
+    def _flush_summary_batch(self, guild_id: str):
+        """Start the batched read for a guild's pending summary requests."""
+        pending = self._pending_summaries.pop(guild_id, None)
+        if not pending:
+            return
+        task = asyncio.create_task(self._resolve_summary_batch(guild_id, pending))
+        self._summary_batch_tasks.add(task)
+        task.add_done_callback(self._summary_batch_tasks.discard)
+
+    async def _resolve_summary_batch(self, guild_id: str, pending: Dict[str, asyncio.Future]):
+        """Read a batch of summaries and hand each waiting request its result."""
+        summaries = await self.get_user_activity_summaries_bulk(list(pending), guild_id, SUMMARY_PROJECTION)
+        loop = asyncio.get_running_loop()
+        for user_id, future in pending.items():
+            summary = summaries.get(user_id)
+            if not future.done():
+                future.set_result(summary)
+            # Misses (including failed reads) aren't kept, so the next request reads again
+            if summary is None:
+                self._expire_summary((guild_id, user_id), future)
+            else:
+                loop.call_later(self._summary_ttl, self._expire_summary, (guild_id, user_id), future)
+
+    def _expire_summary(self, key: tuple, future: asyncio.Future):
+        """Forget a shared summary read, unless a newer read has replaced it."""
+        if self._summary_futures.get(key) is future:
+            del self._summary_futures[key]
+
     async def _enhance_user_summary(self, user_activity: Dict[str, Any]) -> Dict[str, Any]:
         """Enhance user activity summary with calculated metrics."""
         try:
@@ -1008,17 +1118,9 @@ class ActivitySystem:
 
         Returns:
             Time period: 'morning', 'afternoon', 'evening', 'night', or 'overnight'
+            ('unknown' for hours outside 0-23)
         """
-        if 6 <= hour < 12:
-            return "morning"
-        elif 12 <= hour < 18:
-            return "afternoon"
-        elif 18 <= hour < 23:
-            return "evening"
-        elif hour == 23 or hour < 2:
-            return "night"
-        else:  # 2-5
-            return "overnight"
+        return _HOUR_TO_PERIOD[hour] if 0 <= hour < 24 else "unknown"
 
     @staticmethod
     def categorize_weekday(weekday: int) -> str:
@@ -1031,7 +1133,7 @@ class ActivitySystem:
         Returns:
             'weekend' or 'weekday'
         """
-        return "weekend" if weekday in [5, 6] else "weekday"
+        return _WEEKDAY_TO_CATEGORY[weekday] if 0 <= weekday < 7 else "weekday"
 
     def analyze_time_of_day_distribution(self, hourly_pattern: List[int]) -> Dict[str, Any]:
         """
@@ -1047,20 +1149,15 @@ class ActivitySystem:
             if not hourly_pattern or len(hourly_pattern) != 24:
                 return self._empty_time_of_day_distribution()
 
-            # Initialize period counters
+            # Sum activities by period, slicing the same hour ranges as _HOUR_TO_PERIOD
             periods = {
-                "morning": 0,      # 6-11
-                "afternoon": 0,    # 12-17
-                "evening": 0,      # 18-22
-                "night": 0,        # 23-1
-                "overnight": 0     # 2-5
+                "morning": sum(hourly_pattern[6:12]),
+                "afternoon": sum(hourly_pattern[12:18]),
+                "evening": sum(hourly_pattern[18:23]),
+                "night": hourly_pattern[23] + hourly_pattern[0] + hourly_pattern[1],
+                "overnight": sum(hourly_pattern[2:6])
             }
 
-            # Sum activities by period
-            for hour, activity_count in enumerate(hourly_pattern):
-                period = self.categorize_hour_to_time_of_day(hour)
-                periods[period] += activity_count
-
             total_activities = sum(periods.values())
 
             # Calculate percentages
@@ -1183,7 +1280,7 @@ class ActivitySystem:
                     "last_activity_timestamp": {"$gte": cutoff_timestamp}
                 },
                 {"activity_patterns.hourly_pattern": 1}
-            )
+            ).batch_size(SCAN_BATCH_SIZE)
 
             # Aggregate hourly patterns across all users
             guild_hourly_pattern = [0] * 24
@@ -1263,11 +1360,22 @@ class ActivitySystem:
         }
 
         try:
-            # Find all documents with activity patterns
-            cursor = self.collection.find({"activity_patterns": {"$exists": True}})
+            operations = []
+
+            stats["total_documents"] = await self.collection.count_documents(
+                {"activity_patterns": {"$exists": True}}
+            )
+
+            # Only fetch documents that still store a pattern as an object, and only their patterns
+            cursor = self.collection.find(
+                {"$or": [
+                    {"activity_patterns.hourly_pattern": {"$type": "object"}},
+                    {"activity_patterns.weekly_pattern": {"$type": "object"}}
+                ]},
+                {"activity_patterns.hourly_pattern": 1, "activity_patterns.weekly_pattern": 1}
+            ).batch_size(SCAN_BATCH_SIZE)
 
             async for doc in cursor:
-                stats["total_documents"] += 1
                 doc_id = doc["_id"]
                 needs_migration = False
                 update_fields = {}
@@ -1296,15 +1404,13 @@ class ActivitySystem:
                     stats["documents_needing_migration"] += 1
 
                     if not dry_run:
-                        try:
-                            await self.collection.update_one(
-                                {"_id": doc_id},
-                                {"$set": update_fields}
-                            )
-                            self.logger.debug(f"✓ Migrated document {doc_id}")
-                        except Exception as e:
-                            stats["errors"] += 1
-                            self.logger.error(f"✗ Error migrating document {doc_id}: {e}")
+                        operations.append(UpdateOne({"_id": doc_id}, {"$set": update_fields}))
+                        if len(operations) >= MIGRATION_BATCH_SIZE:
+                            await self._write_migration_batch(operations, stats)
+                            operations = []
+
+            if operations:
+                await self._write_migration_batch(operations, stats)
 
             self.logger.info(
                 f"Migration {'simulation' if dry_run else 'complete'}:\n"
@@ -1322,6 +1428,20 @@ class ActivitySystem:
             stats["error"] = str(e)
             return stats
 
+    async def _write_migration_batch(self, operations: List[UpdateOne], stats: Dict[str, Any]):
+        """Apply a batch of pattern migration updates, counting failed documents in stats."""
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            self.logger.debug(f"✓ Migrated batch of {result.modified_count} documents")
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            stats["errors"] += len(write_errors)
+            for error in write_errors:
+                self.logger.error(f"✗ Error migrating document: {error.get('errmsg')}")
+        except Exception as e:
+            stats["errors"] += len(operations)
+            self.logger.error(f"✗ Error migrating batch of {len(operations)} documents: {e}")
+
     # Backward compatibility and utility methods
 
     async def cleanup_bot_data(self, bot: discord.Client):
@@ -1335,7 +1455,7 @@ class ActivitySystem:
             return
 
         try:
-            all_activity_cursor = self.collection.find({}, {"user_id": 1})
+            all_activity_cursor = self.collection.find({}, {"user_id": 1}).batch_size(SCAN_BATCH_SIZE)
             all_activity = await all_activity_cursor.to_list(length=None)
 
             bots_found_and_deleted = 0
@@ -1,21 +1,50 @@
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 
 
 def utc_now_ts() -> float:
-    return datetime.now(timezone.utc).timestamp()
+    # The epoch is UTC-based, so this is the same value as datetime.now(timezone.utc).timestamp()
+    return time.time()
+
+
+def _utc_minute() -> int:
+    """Current UTC minute bucket; day/week/month boundaries always fall on one."""
+    return int(time.time() // 60)
+
+
+@lru_cache(maxsize=1)
+def _today_key_for(minute: int) -> str:
+    return datetime.fromtimestamp(minute * 60, timezone.utc).strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=1)
+def _week_key_for(minute: int) -> str:
+    iso = datetime.fromtimestamp(minute * 60, timezone.utc).isocalendar()
+    return f"{iso.year}-W{iso.week:02d}"
+
+
+@lru_cache(maxsize=1)
+def _month_key_for(minute: int) -> str:
+    return datetime.fromtimestamp(minute * 60, timezone.utc).strftime("%Y-%m")
 
 
 def utc_today_key() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    return _today_key_for(_utc_minute())
 
 
 def utc_week_key() -> str:
-    iso = datetime.now(timezone.utc).isocalendar()
-    return f"{iso.year}-W{iso.week:02d}"
+    return _week_key_for(_utc_minute())
 
 
 def utc_month_key() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m")
+    return _month_key_for(_utc_minute())
+
+
+def utc_period_keys(timestamp: float = None) -> tuple:
+    """(today_key, week_key, month_key) for a UTC timestamp, defaulting to now."""
+    minute = int(timestamp // 60) if timestamp is not None else _utc_minute()
+    return _today_key_for(minute), _week_key_for(minute), _month_key_for(minute)
 
 
 def ctx(**kwargs) -> str:
@@ -20,6 +20,7 @@ class RateLimiter:
 
     def __init__(self):
         self._counters: Dict[str, int] = {}
+        self._expires_at: Dict[str, float] = {}  # Counters created with an explicit TTL
         self._message_rates: Dict[tuple, list] = {}
         self._last_cleanup = time.time()
         self.SPAM_THRESHOLD = 10  # messages per minute
@@ -36,11 +37,30 @@ class RateLimiter:
         self._counters[key] = self._counters.get(key, 0) + 1
         self._cleanup_old_entries(now)
 
+    async def check_and_increment(self, key: str, limit: int, ttl: float) -> bool:
+        """
+        Count one hit against `key` if it is still under `limit`, in a single step.
+
+        The counter expires `ttl` seconds after its first hit. Returns False,
+        without counting, once the limit has been reached.
+        """
+        now = time.time()
+        self._cleanup_old_entries(now)
+        count = self._counters.get(key, 0)
+        if count >= limit:
+            return False
+        if count == 0:
+            self._expires_at[key] = now + ttl
+        self._counters[key] = count + 1
+        return True
+
     def _cleanup_old_entries(self, current_time: float):
         """Clean up entries older than 5 minutes"""
         if current_time - self._last_cleanup > 300:  # Cleanup every 5 minutes
-            keys_to_remove = []
+            keys_to_remove = [key for key, expires_at in self._expires_at.items() if expires_at <= current_time]
             for key in self._counters:
+                if key in self._expires_at:
+                    continue
                 # Key format: "rate_limit:guild:user:type:minute"
                 parts = key.split(":")
                 if len(parts) >= 5:
@@ -51,6 +71,7 @@ class RateLimiter:
 
             for key in keys_to_remove:
                 del self._counters[key]
+                self._expires_at.pop(key, None)
 
             self._last_cleanup = current_time
 
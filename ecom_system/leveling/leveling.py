@@ -1,6 +1,9 @@
+import bisect
 import copy
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
 
 from database.DatabaseManager import get_collection, ensure_database_connection, DatabaseConnectionError, db_manager
 from ecom_system.helpers.helpers import utc_now_ts, utc_today_key, utc_week_key, utc_month_key
@@ -11,6 +14,34 @@ from ecom_system.achievement_system.achievement_system import AchievementSystem
 
 logger = logging.getLogger(__name__)
 
+# Profile fields the message and reaction reward paths read. Excludes the
+# per-channel counter maps, which grow with every channel a user talks in.
+REWARD_VIEW_FIELDS = (
+    "xp",
+    "embers",
+    "level",
+    "prestige_level",
+    "longest_streak",
+    "daily_streak",
+    "last_rewarded",
+    "message_stats.last_message_time",
+    "message_stats.messages",
+    "message_stats.today_key",
+    "message_stats.week_key",
+    "message_stats.month_key",
+    "message_stats.today_xp",
+    "message_stats.today_embers",
+    "message_stats.weekly_xp",
+    "message_stats.weekly_embers",
+    "message_stats.monthly_xp",
+    "message_stats.monthly_embers",
+)
+
+# Total XP needed to reach each level (see LevelingSystem.xp_for_level), so
+# check_level_up is a binary search instead of a level-by-level walk
+MAX_TABULATED_LEVEL = 1000
+LEVEL_XP_THRESHOLDS = tuple(50 * level * (level + 1) for level in range(MAX_TABULATED_LEVEL + 1))
+
 
 class LevelingSystem:
     """
@@ -84,6 +115,8 @@ class LevelingSystem:
             # Verify critical collections are accessible
             await self.verify_critical_collections()
 
+            await self.voice_system.initialize()
+
             logger.info("✅ LevelingSystem fully initialized and ready")
             return True
 
@@ -123,6 +156,26 @@ class LevelingSystem:
             logger.error(f"❌ Error getting user data: {e}")
             return None
 
+    async def get_user_reward_view(self, user_id: str, guild_id: str,
+                                   extra_fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get only the profile fields needed to calculate rewards.
+
+        Args:
+            extra_fields: Additional field paths to include, e.g. one channel's counters
+
+        Returns:
+            The projected user document, or None if the user has no profile
+        """
+        projection = list(REWARD_VIEW_FIELDS)
+        if extra_fields:
+            projection.extend(extra_fields)
+        try:
+            return await self.users.find_one({"user_id": user_id, "guild_id": guild_id}, projection)
+        except Exception as e:
+            logger.error(f"❌ Error getting user reward view: {e}")
+            return None
+
     async def get_enhanced_user_data(self, user_id: str, guild_id: str) -> Optional[Dict[str, Any]]:
         """Get user data and ensure it's validated and migrated."""
         user_doc = await self.get_user_data(user_id, guild_id)
@@ -385,6 +438,101 @@ class LevelingSystem:
         except Exception as e:
             logger.error(f"❌ Error updating user data: {e}")
 
+    async def bulk_update_user_data(self, updates: List[Tuple[str, str, Dict[str, Any]]],
+                                    create_missing: bool = False):
+        """
+        Apply operator updates to several user documents in one round trip.
+
+        Unlike update_user_data this does not re-read or migrate the documents;
+        callers are expected to have loaded them via get_enhanced_user_data,
+        or to pass create_missing=True so absent profiles are inserted with the
+        default profile fields by the same upsert.
+
+        Args:
+            updates: (user_id, guild_id, update_doc) tuples using update operators
+            create_missing: Add the default profile as $setOnInsert to each update
+        """
+        if not updates:
+            return
+
+        try:
+            now = utc_now_ts()
+            operations = []
+            for user_id, guild_id, update_doc in updates:
+                update_doc.setdefault("$set", {})["updated_at"] = now
+                if create_missing:
+                    profile = await self.create_enhanced_user_profile(user_id, guild_id)
+                    update_doc["$setOnInsert"] = self._insert_only_fields(profile, update_doc)
+                logger.debug("📝 Queued bulk user update - G:%s U:%s: %s", guild_id, user_id, update_doc)
+                operations.append(UpdateOne({"user_id": user_id, "guild_id": guild_id}, update_doc, upsert=True))
+
+            await self.users.bulk_write(operations, ordered=False)
+            logger.debug("✅ Bulk user update applied: %s documents", len(operations))
+
+        except Exception as e:
+            logger.error(f"❌ Error applying bulk user update: {e}")
+
+    async def update_user_with_pipeline(self, user_id: str, guild_id: str, pipeline: List[Dict[str, Any]],
+                                        projection: List[str], create_missing: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Apply an aggregation-pipeline update to a user document.
+
+        With create_missing, a user without a profile first gets the default
+        profile inserted, and the pipeline is then applied to it.
+
+        Returns the projected document as it was before the update, or None
+        if the user has no profile (and create_missing is off) or the update failed.
+        """
+        query = {"user_id": user_id, "guild_id": guild_id}
+        try:
+            before = await self.users.find_one_and_update(
+                query, pipeline, projection=projection, return_document=ReturnDocument.BEFORE
+            )
+            if before is None and create_missing:
+                profile = await self.create_enhanced_user_profile(user_id, guild_id)
+                # Upserted so a concurrent first write for the same user can't insert a second profile
+                await self.users.update_one(
+                    query,
+                    {"$setOnInsert": {key: value for key, value in profile.items() if key not in query}},
+                    upsert=True
+                )
+                logger.info("📝 Created new user profile: G:%s U:%s", guild_id, user_id)
+                before = await self.users.find_one_and_update(
+                    query, pipeline, projection=projection, return_document=ReturnDocument.BEFORE
+                )
+            return before
+        except Exception as e:
+            logger.error("❌ Error applying pipeline update for G:%s U:%s: %s", guild_id, user_id, e)
+            return None
+
+    @staticmethod
+    def _insert_only_fields(profile: Dict[str, Any], update_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Flatten a default profile into $setOnInsert fields that don't collide
+        with the paths already written by update_doc's other operators.
+        """
+        touched = set()
+        for operator, fields in update_doc.items():
+            if operator != "$setOnInsert":
+                touched.update(fields)
+
+        def collect(document: Dict[str, Any], prefix: str, out: Dict[str, Any]):
+            for key, value in document.items():
+                path = f"{prefix}{key}"
+                if path in touched:
+                    continue
+                if isinstance(value, dict) and any(t.startswith(path + ".") for t in touched):
+                    collect(value, path + ".", out)
+                else:
+                    out[path] = value
+
+        insert_fields: Dict[str, Any] = {}
+        collect(profile, "", insert_fields)
+        # The filter already supplies the identifying fields on insert
+        insert_fields.pop("user_id", None)
+        insert_fields.pop("guild_id", None)
+        return insert_fields
+
     def _log_update_changes(self, user_id: str, guild_id: str, update_doc: Dict[str, Any],
                             current_data: Optional[Dict[str, Any]]):
         """
@@ -573,15 +721,31 @@ class LevelingSystem:
         """Calculate the total XP required to reach a specific level."""
         return 50 * level * (level + 1)
 
+    def level_for_xp_expression(self, xp_expression: Any) -> Dict[str, Any]:
+        """
+        Aggregation expression for the highest level whose xp_for_level is
+        reached by xp_expression, i.e. floor((sqrt(1 + xp / 12.5) - 1) / 2).
+
+        Lets pipeline updates derive the level from the XP they just wrote.
+        Must be kept in step with xp_for_level. Converted to an int so the
+        stored level stays an integer, as check_level_up produces.
+        """
+        return {"$toInt": {"$floor": {"$divide": [
+            {"$subtract": [{"$sqrt": {"$add": [1, {"$divide": [xp_expression, 12.5]}]}}, 1]}, 2
+        ]}}}
+
     def xp_to_next_level(self, current_level: int) -> int:
         """Calculate the XP needed to advance to the next level."""
         return self.xp_for_level(current_level + 1) - self.xp_for_level(current_level)
 
     def check_level_up(self, current_xp: int, current_level: int) -> tuple:
         """Check if the user levels up based on XP."""
-        new_level = current_level
-        leveled_up = False
+        new_level = max(current_level, bisect.bisect_right(LEVEL_XP_THRESHOLDS, current_xp) - 1)
+        if new_level < MAX_TABULATED_LEVEL:
+            return new_level, new_level > current_level
 
+        # Past the table: walk the remaining levels
+        leveled_up = new_level > current_level
         while True:
             next_level_xp = self.xp_for_level(new_level + 1)
             if current_xp >= next_level_xp:
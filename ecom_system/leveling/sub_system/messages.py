@@ -1,8 +1,11 @@
 import asyncio
+import json
 import logging
 import time
 import re
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 
 from ecom_system.helpers.content_analyzer import ContentAnalyzer
 from ecom_system.helpers.helpers import utc_now_ts, utc_today_key, utc_week_key, utc_month_key
@@ -33,6 +36,165 @@ logger = logging.getLogger(__name__)
 #
 # =============================================================================
 
+# How long values derived from a guild's settings are reused before re-reading them
+SETTINGS_CACHE_TTL_SECONDS = 60
+
+# (settings caps key, message_stats xp field, message_stats embers field, window key field, label)
+# for the global caps applied in process_rewards. Daily totals live in today_*.
+_CAP_SPECS = (
+    ("daily_caps", "today_xp", "today_embers", "today_key", "daily"),
+    ("weekly_caps", "weekly_xp", "weekly_embers", "week_key", "weekly"),
+    ("monthly_caps", "monthly_xp", "monthly_embers", "month_key", "monthly"),
+)
+
+# (window key field, xp counter path, embers counter path) for the per-window reward counters
+_WINDOW_COUNTERS = (
+    ("today_key", "message_stats.today_xp", "message_stats.today_embers"),
+    ("week_key", "message_stats.weekly_xp", "message_stats.weekly_embers"),
+    ("month_key", "message_stats.monthly_xp", "message_stats.monthly_embers"),
+)
+
+
+# Length factors are tabulated up to this many characters (Discord's longest
+# message); anything longer falls back to MessageRewardConfig's formula
+MAX_TABULATED_LENGTH = 4000
+
+
+@lru_cache(maxsize=4096)
+def _channel_counter_paths(channel_id: str) -> Tuple[str, str]:
+    """Return the (xp, embers) message_stats counter paths for a channel."""
+    return f"message_stats.channel_xp.{channel_id}", f"message_stats.channel_embers.{channel_id}"
+
+
+@dataclass
+class QualityConfig:
+    """
+    Flattened view of settings.message.quality_analysis for a single guild.
+
+    Resolved once per settings refresh so the per-message content analysis
+    reads plain attributes instead of walking nested settings dicts.
+    """
+    length_threshold: int = 50
+    length_bonus: float = 1.1
+
+    attachment_only_word_threshold: int = 5
+    attachment_short_text_threshold: int = 20
+    attachment_only_penalty: float = 0.7
+    attachment_short_text_penalty: float = 0.85
+    attachment_bonus: float = 1.08
+
+    emoji_bonus: float = 1.05
+    emoji_penalty_threshold: int = 10
+    emoji_penalty_base: float = 0.75
+    emoji_penalty_increment: float = 0.05
+    emoji_penalty_floor: float = 0.5
+    emoji_only_penalty: float = 0.75
+    emoji_only_word_threshold: int = 3
+
+    link_bonus: float = 1.03
+    link_only_penalty: float = 0.65
+    link_context_word_threshold: int = 10
+    link_spam_threshold: int = 5
+    link_spam_penalty: float = 0.7
+
+    code_bonus: float = 1.07
+    caps_penalty: float = 0.8
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "QualityConfig":
+        """Build a QualityConfig from merged guild settings, falling back to defaults."""
+        quality_cfg = settings.get("message", {}).get("quality_analysis", {})
+        defaults = cls()
+        return cls(
+            length_threshold=quality_cfg.get("length_quality_threshold", defaults.length_threshold),
+            length_bonus=quality_cfg.get("length_quality_bonus", defaults.length_bonus),
+            attachment_only_word_threshold=quality_cfg.get("attachment_only_word_threshold", defaults.attachment_only_word_threshold),
+            attachment_short_text_threshold=quality_cfg.get("attachment_short_text_threshold", defaults.attachment_short_text_threshold),
+            attachment_only_penalty=quality_cfg.get("attachment_only_penalty", defaults.attachment_only_penalty),
+            attachment_short_text_penalty=quality_cfg.get("attachment_with_short_text_penalty", defaults.attachment_short_text_penalty),
+            attachment_bonus=quality_cfg.get("attachment_bonus", defaults.attachment_bonus),
+            emoji_bonus=quality_cfg.get("emoji_bonus", defaults.emoji_bonus),
+            emoji_penalty_threshold=quality_cfg.get("emoji_penalty_threshold", defaults.emoji_penalty_threshold),
+            emoji_penalty_base=quality_cfg.get("emoji_penalty_base", defaults.emoji_penalty_base),
+            emoji_penalty_increment=quality_cfg.get("emoji_penalty_increment", defaults.emoji_penalty_increment),
+            emoji_penalty_floor=quality_cfg.get("emoji_penalty_floor", defaults.emoji_penalty_floor),
+            emoji_only_penalty=quality_cfg.get("emoji_only_penalty", defaults.emoji_only_penalty),
+            emoji_only_word_threshold=quality_cfg.get("emoji_only_word_threshold", defaults.emoji_only_word_threshold),
+            link_bonus=quality_cfg.get("link_bonus", defaults.link_bonus),
+            link_only_penalty=quality_cfg.get("link_only_penalty", defaults.link_only_penalty),
+            link_context_word_threshold=quality_cfg.get("link_context_word_threshold", defaults.link_context_word_threshold),
+            link_spam_threshold=quality_cfg.get("link_spam_threshold", defaults.link_spam_threshold),
+            link_spam_penalty=quality_cfg.get("link_spam_penalty", defaults.link_spam_penalty),
+            code_bonus=quality_cfg.get("code_block_bonus", defaults.code_bonus),
+            caps_penalty=quality_cfg.get("caps_penalty", defaults.caps_penalty),
+        )
+
+
+@dataclass
+class MessageRewardConfig:
+    """
+    Flattened view of the settings.message reward knobs for a single guild.
+
+    Channel and premium-channel bonuses are folded into one multiplier per
+    channel, and the length factor is tabulated up to max_length, so reward
+    calculation does plain lookups per message.
+    """
+    base_xp: float = 10
+    base_embers: float = 6
+    max_length: int = 1200
+    channel_multipliers: Dict[str, float] = field(default_factory=dict)
+    thread_multiplier: float = 1.15
+    thread_creator_multiplier: float = 1.25
+    length_factor_table: List[float] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Messages up to 100 chars get no bonus; above that the bonus scales
+        # linearly up to +50% at max_length
+        table_end = min(self.max_length, MAX_TABULATED_LENGTH)
+        bonus_range = self.max_length - 100
+        if bonus_range > 0:
+            self.length_factor_table = [1.0] * 101 + [
+                1.0 + ((length - 100) / bonus_range) * 0.5
+                for length in range(101, table_end + 1)
+            ]
+        else:
+            self.length_factor_table = [1.0] * (max(table_end, 0) + 1)
+
+    def length_factor(self, message_length: int) -> float:
+        """Return the length multiplier for a message of the given length."""
+        if message_length < len(self.length_factor_table):
+            return self.length_factor_table[message_length]
+        bonus_range = self.max_length - 100
+        if bonus_range <= 0:
+            return 1.0
+        return 1.0 + ((min(message_length, self.max_length) - 100) / bonus_range) * 0.5
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "MessageRewardConfig":
+        """Build a MessageRewardConfig from merged guild settings, falling back to defaults."""
+        msg_cfg = settings.get("message", {})
+        defaults = cls()
+
+        channel_bonuses = msg_cfg.get("channel_bonuses", {})
+        premium_channels = msg_cfg.get("premium_channels", {})
+        channel_multipliers = {
+            cid: channel_bonuses.get(cid, 1.0) * premium_channels.get(cid, 1.0)
+            for cid in set(channel_bonuses) | set(premium_channels)
+        }
+
+        # Thread bonuses only ever raise rewards
+        thread_bonus = msg_cfg.get("thread_bonus", defaults.thread_multiplier)
+        thread_starter_bonus = msg_cfg.get("thread_starter_bonus", defaults.thread_creator_multiplier)
+
+        return cls(
+            base_xp=msg_cfg.get("base_xp", defaults.base_xp),
+            base_embers=msg_cfg.get("base_embers", defaults.base_embers),
+            max_length=int(msg_cfg.get("max_length", defaults.max_length)),
+            channel_multipliers=channel_multipliers,
+            thread_multiplier=thread_bonus if thread_bonus > 1.0 else 1.0,
+            thread_creator_multiplier=thread_starter_bonus if thread_starter_bonus > 1.0 else 1.0,
+        )
+
 
 class MessageLevelingSystem:
     """
@@ -56,6 +218,30 @@ class MessageLevelingSystem:
         r")"
     )
 
+    # Patterns used to strip non-word tokens before counting real words
+    _CUSTOM_EMOJI_REGEX = re.compile(r'<a?:\w+:\d+>')  # <:name:id> or <a:name:id>
+    _EMOJI_SHORTCODE_REGEX = re.compile(r':\w+:')  # :emoji_name:
+    _UNICODE_EMOJI_REGEX = re.compile(
+        r'[\U0001F300-\U0001F9FF]|'  # Common emoji block
+        r'[\U0001F600-\U0001F64F]|'  # Emoticons
+        r'[\U0001F680-\U0001F6FF]|'  # Transport & map symbols
+        r'[\u2600-\u27BF]|'  # Miscellaneous Symbols
+        r'[\u2700-\u27BF]|'  # Dingbats
+        r'[\uFE00-\uFE0F]|'  # Variation Selectors
+        r'[\u200D]'  # Zero Width Joiner (used in multi-part emojis)
+    )
+
+    # Inline or fenced code blocks
+    _CODE_BLOCK_REGEX = re.compile(r'```[\s\S]*?```|`[^`]+`')
+
+    # Byte-level scanners for ASCII-only messages. _URL_BYTES_REGEX mirrors
+    # ContentAnalyzer's URL pattern; \x1c-\x1f are whitespace to str regexes only.
+    _URL_BYTES_REGEX = re.compile(rb'(https?://[^\s\x1c-\x1f]+)')
+    _CODE_BLOCK_BYTES_REGEX = re.compile(rb'```[\s\S]*?```|`[^`]+`')
+
+    # ASCII 'A'-'Z', stripped with bytes.translate to count capitals in C
+    _UPPER_SET = bytes(range(65, 91))
+
     def __init__(self, leveling_system):
         """Initialize with reference to parent LevelingSystem"""
         self.leveling_system = leveling_system
@@ -64,6 +250,63 @@ class MessageLevelingSystem:
         # Initialize level-up message handler (will be set by bot)
         self.level_up_messages = None
 
+        # Background level-up tasks, held so they aren't garbage collected mid-run
+        self._level_up_tasks: set = set()
+
+        # Per-guild resolved quality settings: guild_id -> (expires_at, QualityConfig)
+        self._quality_cfg_cache: Dict[str, Tuple[float, QualityConfig]] = {}
+
+        # Per-guild resolved reward settings: guild_id -> (expires_at, MessageRewardConfig)
+        self._reward_cfg_cache: Dict[str, Tuple[float, MessageRewardConfig]] = {}
+
+        # Guilds with leveling turned off: guild_id -> expires_at
+        self._disabled_guilds: Dict[str, float] = {}
+
+    def _is_guild_disabled(self, guild_id: str) -> bool:
+        """Check the cached disabled flag for a guild without loading settings."""
+        expires_at = self._disabled_guilds.get(guild_id)
+        if expires_at is None:
+            return False
+        if expires_at > time.time():
+            return True
+        del self._disabled_guilds[guild_id]
+        return False
+
+    def _refresh_guild_enabled(self, guild_id: str, settings: Dict[str, Any]) -> bool:
+        """
+        Record whether leveling is enabled for a guild from freshly loaded settings.
+
+        The flag comes from the guild's Master settings (`enabled`, default True).
+        """
+        if settings.get("enabled", True):
+            self._disabled_guilds.pop(guild_id, None)
+            return True
+        self._disabled_guilds[guild_id] = time.time() + SETTINGS_CACHE_TTL_SECONDS
+        return False
+
+    @staticmethod
+    def _get_cached_config(cache: Dict[str, Tuple[float, Any]], guild_id: str, settings: Dict[str, Any], config_cls):
+        """
+        Return the cached config object for a guild, rebuilding it from the
+        freshly loaded settings once the cached entry has expired.
+        """
+        now = time.time()
+        cached = cache.get(guild_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        config = config_cls.from_settings(settings)
+        cache[guild_id] = (now + SETTINGS_CACHE_TTL_SECONDS, config)
+        return config
+
+    def _get_quality_config(self, guild_id: str, settings: Dict[str, Any]) -> QualityConfig:
+        """Return the cached QualityConfig for a guild."""
+        return self._get_cached_config(self._quality_cfg_cache, guild_id, settings, QualityConfig)
+
+    def _get_reward_config(self, guild_id: str, settings: Dict[str, Any]) -> MessageRewardConfig:
+        """Return the cached MessageRewardConfig for a guild."""
+        return self._get_cached_config(self._reward_cfg_cache, guild_id, settings, MessageRewardConfig)
+
     @log_performance("process_message")
     async def process_message(
             self,
@@ -79,6 +322,10 @@ class MessageLevelingSystem:
         """
         Process a message and calculate rewards with comprehensive logging.
         """
+        # Fast path: guilds with leveling disabled skip the whole pipeline
+        if self._is_guild_disabled(guild_id):
+            return None
+
         start_time = time.time()
 
         # Initialize tracking variables for final summary
@@ -124,7 +371,14 @@ class MessageLevelingSystem:
             logger.debug("Step 2: Loading guild settings and user data...")
 
             settings = await self.leveling_system.get_guild_settings(guild_id)
-            user_data = await self.leveling_system.get_user_data(user_id, guild_id)
+            if not self._refresh_guild_enabled(guild_id, settings):
+                logger.debug(f"  ⏭️  Leveling disabled for G:{guild_id}, skipping message")
+                return None
+
+            quality_cfg = self._get_quality_config(guild_id, settings)
+            reward_cfg = self._get_reward_config(guild_id, settings)
+            channel_fields = list(_channel_counter_paths(channel_id)) if channel_id else None
+            user_data = await self.leveling_system.get_user_reward_view(user_id, guild_id, channel_fields)
 
             if not user_data:
                 logger.info(f"  🆕 Creating new user profile for U:{user_id}")
@@ -144,7 +398,7 @@ class MessageLevelingSystem:
             logger.debug("Step 3: Validating message...")
 
             message_length = len(message_content)
-            validation_result = await self.validate_message(message_length, settings, user_data, channel_id, has_attachments)
+            validation_result = self.validate_message(message_length, settings, user_data, channel_id, has_attachments)
 
             processing_steps["validation"]["duration_ms"] = (time.time() - step_start) * 1000
 
@@ -164,7 +418,7 @@ class MessageLevelingSystem:
             step_start = time.time()
             logger.debug("Step 4: Analyzing message content...")
 
-            content_analysis = self.analyze_message_content(message_content, settings, has_attachments)
+            content_analysis = self.analyze_message_content(message_content, settings, has_attachments, quality_cfg)
 
             processing_steps["content_analysis"]["completed"] = True
             processing_steps["content_analysis"]["duration_ms"] = (time.time() - step_start) * 1000
@@ -192,8 +446,9 @@ class MessageLevelingSystem:
             step_start = time.time()
             logger.debug("Step 5: Calculating rewards...")
 
-            rewards = await self.calculate_message_rewards(
-                message_length, user_data, settings, content_analysis, channel_id, is_thread, is_thread_creator
+            rewards = self.calculate_message_rewards(
+                message_length, user_data, settings, content_analysis, channel_id, is_thread, is_thread_creator,
+                reward_cfg
             )
 
             processing_steps["reward_calculation"]["completed"] = True
@@ -291,7 +546,11 @@ class MessageLevelingSystem:
             content_analysis: Dict[str, Any] = None
     ):
         """
-        Log a comprehensive final summary of message processing.
+        Log a structured final summary of message processing as a single JSON record.
+
+        The summary is emitted with one logger call so each message costs a single
+        handler dispatch; the same dict is attached as `extra["summary"]` for
+        formatters that understand structured records (e.g. JSONFormatter).
 
         Args:
             guild_id: Guild ID
@@ -306,90 +565,76 @@ class MessageLevelingSystem:
             rewards: Calculated rewards if applicable
             content_analysis: Content analysis results if applicable
         """
-        total_time = (time.time() - start_time) * 1000
+        if not logger.isEnabledFor(logging.INFO):
+            return
 
-        logger.info("=" * 70)
-        logger.info(f"📋 MESSAGE PROCESSING SUMMARY - G:{guild_id} U:{user_id}")
-        logger.info("=" * 70)
-
-        # Overall status
-        if success:
-            logger.info(f"✅ Status: SUCCESS")
-        else:
-            logger.info(f"❌ Status: FAILED - {reason}")
-
-        logger.info(f"⏱️  Total Time: {total_time:.2f}ms")
-        logger.info("")
-
-        # Step-by-step breakdown
-        logger.info("📊 Processing Steps:")
-        logger.info("-" * 70)
+        total_time = (time.time() - start_time) * 1000
 
+        steps = {}
         for step_name, step_data in processing_steps.items():
-            step_display = step_name.replace("_", " ").title()
-            duration = step_data.get("duration_ms", 0)
-            percentage = (duration / total_time * 100) if total_time > 0 else 0
-
-            if step_name == "anti_cheat":
-                status = "✅ PASSED" if step_data.get("passed") else "❌ FAILED"
-            elif step_name == "validation":
-                if step_data.get("passed"):
-                    status = "✅ PASSED"
-                else:
-                    status = f"❌ FAILED: {step_data.get('reason', 'Unknown')}"
+            if step_name in ("anti_cheat", "validation"):
+                status = "passed" if step_data.get("passed") else "failed"
             else:
-                status = "✅ COMPLETED" if step_data.get("completed") else "⏭️  SKIPPED"
-
-            logger.info(f"  {step_display:20} {status:30} {duration:6.2f}ms ({percentage:5.1f}%)")
-
-        logger.info("-" * 70)
+                status = "completed" if step_data.get("completed") else "skipped"
+
+            step_summary = {"status": status, "duration_ms": round(step_data.get("duration_ms", 0), 2)}
+            if step_name == "validation" and not step_data.get("passed") and step_data.get("reason"):
+                step_summary["reason"] = step_data["reason"]
+            steps[step_name] = step_summary
+
+        summary = {
+            "guild_id": guild_id,
+            "user_id": user_id,
+            "status": "success" if success else "failed",
+            "total_ms": round(total_time, 2),
+            "steps": steps,
+            "context": {
+                "in_thread": is_thread,
+                "thread_creator": bool(is_thread and is_thread_creator)
+            }
+        }
+        if not success:
+            summary["reason"] = reason
 
         # Success details
         if success and result:
-            logger.info("")
-            logger.info("🎉 Results:")
-            logger.info(f"  • XP Gained: +{result['rewards']['xp']}")
-            logger.info(f"  • Embers Gained: +{result['rewards']['embers']}")
-            logger.info(f"  • New XP Total: {result['totals']['xp']}")
-            logger.info(f"  • New Embers Total: {result['totals']['embers']}")
-            logger.info(f"  • Current Level: {result['totals']['level']}")
-
-            if result.get('leveled_up'):
-                level_up = result.get('level_up', {})
-                logger.info(f"  🎊 LEVEL UP! {level_up.get('old_level', '?')} → {level_up.get('new_level', '?')}")
+            summary["results"] = {
+                "xp_gained": result["rewards"]["xp"],
+                "embers_gained": result["rewards"]["embers"],
+                "xp_total": result["totals"]["xp"],
+                "embers_total": result["totals"]["embers"],
+                "level": result["totals"]["level"],
+                "leveled_up": bool(result.get("leveled_up"))
+            }
+            if result.get("leveled_up"):
+                level_up = result.get("level_up", {})
+                summary["results"]["level_up"] = {
+                    "old_level": level_up.get("old_level"),
+                    "new_level": level_up.get("new_level")
+                }
 
             if content_analysis:
-                logger.info("")
-                logger.info("📈 Content Quality:")
-                logger.info(f"  • Score: {content_analysis['score']:.2f}")
-                logger.info(f"  • Length: {content_analysis['length']} chars")
-                logger.info(f"  • Words: {content_analysis['word_count']}")
-                if content_analysis.get('factors'):
-                    logger.info(f"  • Quality Factors: {', '.join(content_analysis['factors'])}")
+                summary["content_quality"] = {
+                    "score": round(content_analysis["score"], 2),
+                    "length": content_analysis["length"],
+                    "words": content_analysis["word_count"],
+                    "factors": content_analysis.get("factors", [])
+                }
 
             if rewards and settings:
                 msg_cfg = settings.get("message", {})
-                base_xp = msg_cfg.get("base_xp", 10)
-                base_embers = msg_cfg.get("base_embers", 6)
                 multipliers = result.get("multipliers", {})
+                summary["reward_calculation"] = {
+                    "base_xp": msg_cfg.get("base_xp", 10),
+                    "base_embers": msg_cfg.get("base_embers", 6),
+                    "multipliers": {
+                        name: round(multipliers.get(name, 1.0), 2)
+                        for name in ("quality", "streak", "length", "channel", "low_level")
+                    }
+                }
 
-                logger.info("")
-                logger.info("⚙️ Reward Calculation:")
-                logger.info(f"  • Base Rewards: {base_xp} XP, {base_embers} Embers")
-                logger.info(f"  • Multipliers:")
-                logger.info(f"    - Quality: {multipliers.get('quality', 1.0):.2f}x")
-                logger.info(f"    - Streak: {multipliers.get('streak', 1.0):.2f}x")
-                logger.info(f"    - Length: {multipliers.get('length', 1.0):.2f}x")
-                logger.info(f"    - Channel/Thread: {multipliers.get('channel', 1.0):.2f}x")
-                logger.info(f"    - Low Level: {multipliers.get('low_level', 1.0):.2f}x")
-
-            logger.info("")
-            logger.info("📝 Message Context:")
-            logger.info(f"  • In Thread: {'Yes' if is_thread else 'No'}")
-            if is_thread and is_thread_creator:
-                logger.info(f"  • Thread Creator: Yes (extra bonus applied)")
-
-        logger.info("=" * 70)
+        logger.info("📋 Message processing summary: %s", json.dumps(summary, ensure_ascii=False, default=str),
+                    extra={"summary": summary})
 
     async def check_anti_cheat(self, guild_id: str, user_id: str, content: str) -> bool:
         """
@@ -451,7 +696,13 @@ class MessageLevelingSystem:
 
         return True
 
-    def analyze_message_content(self, content: str, settings: Dict[str, Any], has_attachments: bool = False) -> Dict[str, Any]:
+    def analyze_message_content(
+            self,
+            content: str,
+            settings: Dict[str, Any],
+            has_attachments: bool = False,
+            quality_cfg: Optional[QualityConfig] = None
+    ) -> Dict[str, Any]:
         """
         Analyzes message content to determine a quality score and gather metrics.
 
@@ -471,38 +722,31 @@ class MessageLevelingSystem:
             content: The text content of the message.
             settings: A dictionary containing the guild's leveling settings.
             has_attachments: A boolean indicating if the message has attachments.
+            quality_cfg: Pre-resolved quality settings for the guild. Built from
+                `settings` when not provided.
 
         Returns:
             A dictionary containing the analysis results, including the quality
             score, content metrics (word count, emoji count, etc.), and a list
             of factors that influenced the score.
         """
-        quality_cfg = settings.get("message", {}).get("quality_analysis", {})
+        if quality_cfg is None:
+            quality_cfg = QualityConfig.from_settings(settings)
 
         # Calculate real word count (excluding emoji patterns and URLs)
         # Debug: Log original content
         logger.debug(f"  📝 Original content: {repr(content)}")
 
         # Remove custom Discord emojis: <:name:id> or <a:name:id>
-        content_no_custom_emojis = re.sub(r'<a?:\w+:\d+>', '', content)
+        content_no_custom_emojis = self._CUSTOM_EMOJI_REGEX.sub('', content)
         logger.debug(f"  📝 After removing custom emojis: {repr(content_no_custom_emojis)}")
 
         # Remove emoji shortcodes: :emoji_name:
-        content_no_emoji_shortcodes = re.sub(r':\w+:', '', content_no_custom_emojis)
+        content_no_emoji_shortcodes = self._EMOJI_SHORTCODE_REGEX.sub('', content_no_custom_emojis)
         logger.debug(f"  📝 After removing shortcodes: {repr(content_no_emoji_shortcodes)}")
 
-        # Remove Unicode emojis using comprehensive pattern
-        # This pattern matches all common emoji ranges
-        unicode_emoji_pattern = re.compile(
-            r'[\U0001F300-\U0001F9FF]|'  # Common emoji block
-            r'[\U0001F600-\U0001F64F]|'  # Emoticons
-            r'[\U0001F680-\U0001F6FF]|'  # Transport & map symbols
-            r'[\u2600-\u27BF]|'  # Miscellaneous Symbols
-            r'[\u2700-\u27BF]|'  # Dingbats
-            r'[\uFE00-\uFE0F]|'  # Variation Selectors
-            r'[\u200D]'  # Zero Width Joiner (used in multi-part emojis)
-        )
-        content_no_unicode_emojis = unicode_emoji_pattern.sub('', content_no_emoji_shortcodes)
+        # Remove Unicode emojis
+        content_no_unicode_emojis = self._UNICODE_EMOJI_REGEX.sub('', content_no_emoji_shortcodes)
         logger.debug(f"  📝 After removing Unicode emojis: {repr(content_no_unicode_emojis)}")
 
         # Remove URLs (links should not count as words)
@@ -513,14 +757,26 @@ class MessageLevelingSystem:
         real_word_count = len([word for word in content_no_urls.split() if word.strip()])
         logger.debug(f"  📝 Real word count: {real_word_count}")
 
+        # ASCII messages (the common case) are encoded once and the link, code
+        # block and caps scans share that buffer; anything else scans the str
+        if content.isascii():
+            content_bytes = content.encode("ascii")
+            link_count = len(self._URL_BYTES_REGEX.findall(content_bytes))
+            code_block_count = len(self._CODE_BLOCK_BYTES_REGEX.findall(content_bytes))
+            upper_count = len(content_bytes) - len(content_bytes.translate(None, self._UPPER_SET))
+        else:
+            link_count = ContentAnalyzer.count_links(content)
+            code_block_count = len(self._CODE_BLOCK_REGEX.findall(content))
+            upper_count = sum(1 for c in content if c.isupper())
+
         analysis = {
             "score": 1.0,
             "length": len(content),
             "word_count": real_word_count,
             "emoji_count": ContentAnalyzer.count_emojis(content),
-            "link_count": ContentAnalyzer.count_links(content),
-            "code_block_count": len(re.findall(r'```[\s\S]*?```|`[^`]+`', content)),
-            "caps_ratio": sum(1 for c in content if c.isupper()) / len(content) if content else 0,
+            "link_count": link_count,
+            "code_block_count": code_block_count,
+            "caps_ratio": upper_count / len(content) if content else 0,
             "has_attachments": has_attachments,
             "has_links": False,
             "bonuses": {},
@@ -529,8 +785,8 @@ class MessageLevelingSystem:
         }
 
         # Length bonus
-        length_threshold = quality_cfg.get("length_quality_threshold", 50)
-        length_bonus_multiplier = quality_cfg.get("length_quality_bonus", 1.1)
+        length_threshold = quality_cfg.length_threshold
+        length_bonus_multiplier = quality_cfg.length_bonus
         if analysis["length"] >= length_threshold:
             analysis["score"] *= length_bonus_multiplier
             analysis["bonuses"]["length"] = length_bonus_multiplier
@@ -541,13 +797,13 @@ class MessageLevelingSystem:
             word_count = analysis["word_count"]
 
             # Thresholds for attachment context (configurable)
-            attachment_only_threshold = quality_cfg.get("attachment_only_word_threshold", 5)
-            attachment_short_text_threshold = quality_cfg.get("attachment_short_text_threshold", 20)
+            attachment_only_threshold = quality_cfg.attachment_only_word_threshold
+            attachment_short_text_threshold = quality_cfg.attachment_short_text_threshold
 
             # Penalties and bonuses (from MongoDB settings)
-            attachment_only_penalty = quality_cfg.get("attachment_only_penalty", 0.7)
-            attachment_short_text_penalty = quality_cfg.get("attachment_with_short_text_penalty", 0.85)
-            attachment_bonus = quality_cfg.get("attachment_bonus", 1.08)
+            attachment_only_penalty = quality_cfg.attachment_only_penalty
+            attachment_short_text_penalty = quality_cfg.attachment_short_text_penalty
+            attachment_bonus = quality_cfg.attachment_bonus
 
             if word_count < attachment_only_threshold:
                 # Attachment with no/minimal text - apply penalty
@@ -576,13 +832,13 @@ class MessageLevelingSystem:
 
         if emoji_count > 0:
             # Get emoji settings from quality config
-            emoji_bonus = quality_cfg.get("emoji_bonus", 1.05)
-            emoji_penalty_threshold = quality_cfg.get("emoji_penalty_threshold", 10)
-            emoji_penalty_base = quality_cfg.get("emoji_penalty_base", 0.75)
-            emoji_penalty_increment = quality_cfg.get("emoji_penalty_increment", 0.05)
-            emoji_penalty_floor = quality_cfg.get("emoji_penalty_floor", 0.5)
-            emoji_only_penalty = quality_cfg.get("emoji_only_penalty", 0.75)
-            emoji_only_word_threshold = quality_cfg.get("emoji_only_word_threshold", 3)
+            emoji_bonus = quality_cfg.emoji_bonus
+            emoji_penalty_threshold = quality_cfg.emoji_penalty_threshold
+            emoji_penalty_base = quality_cfg.emoji_penalty_base
+            emoji_penalty_increment = quality_cfg.emoji_penalty_increment
+            emoji_penalty_floor = quality_cfg.emoji_penalty_floor
+            emoji_only_penalty = quality_cfg.emoji_only_penalty
+            emoji_only_word_threshold = quality_cfg.emoji_only_word_threshold
 
             # Check for emoji-only messages (very few words, mostly emojis)
             if word_count < emoji_only_word_threshold:
@@ -616,11 +872,11 @@ class MessageLevelingSystem:
             analysis["has_links"] = True
 
             # Get link analysis settings
-            link_bonus = quality_cfg.get("link_bonus", 1.03)
-            link_only_penalty = quality_cfg.get("link_only_penalty", 0.65)
-            link_context_word_threshold = quality_cfg.get("link_context_word_threshold", 10)
-            link_spam_threshold = quality_cfg.get("link_spam_threshold", 5)
-            link_spam_penalty = quality_cfg.get("link_spam_penalty", 0.7)
+            link_bonus = quality_cfg.link_bonus
+            link_only_penalty = quality_cfg.link_only_penalty
+            link_context_word_threshold = quality_cfg.link_context_word_threshold
+            link_spam_threshold = quality_cfg.link_spam_threshold
+            link_spam_penalty = quality_cfg.link_spam_penalty
 
             link_count = analysis["link_count"]
             word_count = analysis["word_count"]
@@ -650,14 +906,14 @@ class MessageLevelingSystem:
 
         # Code block bonus
         if analysis["code_block_count"] > 0:
-            code_block_bonus_multiplier = quality_cfg.get("code_block_bonus", 1.07)
+            code_block_bonus_multiplier = quality_cfg.code_bonus
             analysis["score"] *= code_block_bonus_multiplier
             analysis["bonuses"]["code_block"] = code_block_bonus_multiplier
             analysis["factors"].append("code_sharing")
 
         # Caps penalty
         if analysis["caps_ratio"] > 0.7:
-            caps_penalty_multiplier = quality_cfg.get("caps_penalty", 0.8)
+            caps_penalty_multiplier = quality_cfg.caps_penalty
             analysis["score"] *= caps_penalty_multiplier
             analysis["penalties"]["excessive_caps"] = caps_penalty_multiplier
             analysis["factors"].append("penalty_caps")
@@ -667,7 +923,7 @@ class MessageLevelingSystem:
 
         return analysis
 
-    async def validate_message(self, message_length: int, settings: Dict, user_data: Dict, channel_id: str = None, has_attachments: bool = False) -> \
+    def validate_message(self, message_length: int, settings: Dict, user_data: Dict, channel_id: str = None, has_attachments: bool = False) -> \
     Dict[str, Any]:
         """
         Basic message validation.
@@ -754,7 +1010,7 @@ class MessageLevelingSystem:
         logger.debug(f"    ✅ All validation checks passed")
         return {"valid": True, "reason": "validation_passed"}
 
-    async def calculate_message_rewards(
+    def calculate_message_rewards(
             self,
             message_length: int,
             user_data: Dict,
@@ -762,104 +1018,83 @@ class MessageLevelingSystem:
             content_analysis: Dict,
             channel_id: str = None,
             is_thread: bool = False,
-            is_thread_creator: bool = False
+            is_thread_creator: bool = False,
+            reward_cfg: Optional[MessageRewardConfig] = None
     ) -> Dict[str, float]:
         """
         Calculate message rewards based on content and user stats.
-        """
-        try:
-            logger.debug(f"  💰 Calculating rewards:")
-
-            msg_cfg = settings.get("message", {})
-            base_xp = msg_cfg.get("base_xp", 10)
-            base_embers = msg_cfg.get("base_embers", 6)
-            max_length = msg_cfg.get("max_length", 1200)
 
-            logger.debug(f"    • Base XP: {base_xp}, Base Embers: {base_embers}")
-            logger.debug(f"    • Max length: {max_length}")
-
-            # Length factor - use a more reasonable scaling
-            if message_length <= 100:
-                length_factor = 1.0
-            else:
-                bonus_length = min(message_length - 100, max_length - 100)
-                length_factor = 1.0 + (bonus_length / (max_length - 100)) * 0.5  # Up to 50% bonus
+        Pure arithmetic over pre-resolved settings; missing settings fall back
+        to MessageRewardConfig defaults, so no error handling is needed here.
+        """
+        logger.debug(f"  💰 Calculating rewards:")
 
-            logger.debug(f"    • Length factor: {length_factor:.2f} (message: {message_length} chars)")
+        if reward_cfg is None:
+            reward_cfg = MessageRewardConfig.from_settings(settings)
+        base_xp = reward_cfg.base_xp
+        base_embers = reward_cfg.base_embers
+        max_length = reward_cfg.max_length
 
-            # Streak bonus
-            daily_streak = user_data.get("daily_streak", {}).get("count", 0)
-            streak_bonus = get_streak_bonus(daily_streak)
+        logger.debug(f"    • Base XP: {base_xp}, Base Embers: {base_embers}")
+        logger.debug(f"    • Max length: {max_length}")
 
-            # Quality multiplier
-            quality_score = content_analysis.get("score", 1.0)
-            logger.debug(f"    • Quality multiplier: {quality_score:.2f}x")
+        # Length factor - up to 50% bonus, precomputed per guild
+        length_factor = reward_cfg.length_factor(message_length)
 
-            # Low level boost
-            current_level = user_data.get("level", 1)
-            if current_level < 15:
-                xp_multiplier = 2.0
-                embers_multiplier = 1.5
-                logger.debug(
-                    f"    • Low-level boost active (Level {current_level}): XP {xp_multiplier}x, Embers {embers_multiplier}x")
-            else:
-                xp_multiplier = 1.0
-                embers_multiplier = 1.0
-
-            # Channel and thread bonuses
-            channel_multiplier = 1.0
-            
-            channel_bonuses = msg_cfg.get("channel_bonuses", {})
-            if channel_id and channel_id in channel_bonuses:
-                bonus = channel_bonuses[channel_id]
-                channel_multiplier *= bonus
-                logger.debug(f"    • Channel bonus applied: {bonus}x")
-
-            premium_channels = msg_cfg.get("premium_channels", {})
-            if channel_id and channel_id in premium_channels:
-                bonus = premium_channels[channel_id]
-                channel_multiplier *= bonus
-                logger.debug(f"    • Premium channel bonus applied: {bonus}x")
-
-            if is_thread:
-                thread_bonus = msg_cfg.get("thread_bonus", 1.15)
-                if thread_bonus > 1.0:
-                    channel_multiplier *= thread_bonus
-                    logger.debug(f"    • Thread bonus applied: {thread_bonus}x")
-
-                # Additional bonus for thread creators (encourages quality thread creation)
-                if is_thread_creator:
-                    thread_starter_bonus = msg_cfg.get("thread_starter_bonus", 1.25)
-                    if thread_starter_bonus > 1.0:
-                        channel_multiplier *= thread_starter_bonus
-                        logger.debug(f"    • Thread creator bonus applied: {thread_starter_bonus}x")
+        logger.debug(f"    • Length factor: {length_factor:.2f} (message: {message_length} chars)")
 
-            # Calculate final rewards
-            calculated_xp = base_xp * length_factor * streak_bonus * quality_score * xp_multiplier * channel_multiplier
-            calculated_embers = base_embers * length_factor * streak_bonus * quality_score * embers_multiplier * channel_multiplier
+        # Streak bonus
+        daily_streak = (user_data.get("daily_streak") or {}).get("count", 0)
+        streak_bonus = get_streak_bonus(daily_streak)
 
-            final_xp = max(1, round(calculated_xp))
-            final_embers = max(1, round(calculated_embers))
+        # Quality multiplier
+        quality_score = content_analysis.get("score", 1.0)
+        logger.debug(f"    • Quality multiplier: {quality_score:.2f}x")
 
+        # Low level boost
+        current_level = user_data.get("level", 1)
+        if current_level < 15:
+            xp_multiplier = 2.0
+            embers_multiplier = 1.5
             logger.debug(
-                f"    • Calculation: {base_xp} * {length_factor:.2f} * {streak_bonus:.2f} * {quality_score:.2f} * {xp_multiplier:.2f} * {channel_multiplier:.2f} = {calculated_xp:.2f}")
-            logger.debug(f"    • Final: {final_xp} XP, {final_embers} Embers")
-
-            return {
-                "xp": float(final_xp),
-                "embers": float(final_embers),
-                "multipliers": {
-                    "length": length_factor,
-                    "streak": streak_bonus,
-                    "quality": quality_score,
-                    "low_level": xp_multiplier,
-                    "channel": channel_multiplier
-                }
+                f"    • Low-level boost active (Level {current_level}): XP {xp_multiplier}x, Embers {embers_multiplier}x")
+        else:
+            xp_multiplier = 1.0
+            embers_multiplier = 1.0
+
+        # Channel and thread bonuses
+        channel_multiplier = reward_cfg.channel_multipliers.get(channel_id, 1.0) if channel_id else 1.0
+        if is_thread:
+            channel_multiplier *= reward_cfg.thread_multiplier
+            # Additional bonus for thread creators (encourages quality thread creation)
+            if is_thread_creator:
+                channel_multiplier *= reward_cfg.thread_creator_multiplier
+
+        if channel_multiplier != 1.0:
+            logger.debug(f"    • Channel/thread multiplier applied: {channel_multiplier:.2f}x")
+
+        # Calculate final rewards
+        calculated_xp = base_xp * length_factor * streak_bonus * quality_score * xp_multiplier * channel_multiplier
+        calculated_embers = base_embers * length_factor * streak_bonus * quality_score * embers_multiplier * channel_multiplier
+
+        final_xp = max(1, round(calculated_xp))
+        final_embers = max(1, round(calculated_embers))
+
+        logger.debug(
+            f"    • Calculation: {base_xp} * {length_factor:.2f} * {streak_bonus:.2f} * {quality_score:.2f} * {xp_multiplier:.2f} * {channel_multiplier:.2f} = {calculated_xp:.2f}")
+        logger.debug(f"    • Final: {final_xp} XP, {final_embers} Embers")
+
+        return {
+            "xp": float(final_xp),
+            "embers": float(final_embers),
+            "multipliers": {
+                "length": length_factor,
+                "streak": streak_bonus,
+                "quality": quality_score,
+                "low_level": xp_multiplier,
+                "channel": channel_multiplier
             }
-
-        except Exception as e:
-            logger.error(f"❌ Reward calculation failed: {e}")
-            return {"xp": 10.0, "embers": 6.0}
+        }
 
     async def process_rewards(
             self,
@@ -879,82 +1114,31 @@ class MessageLevelingSystem:
         - Cap the rewards accordingly and log when caps are hit
         """
         try:
-            logger.debug(f"  💾 Processing rewards and updating database:")
+            logger.debug("  💾 Processing rewards and updating database:")
 
             current_xp = user_data.get("xp", 0)
             current_embers = user_data.get("embers", 0)
             current_level = user_data.get("level", 1)
 
-            logger.debug(f"    • Current state: Level {current_level}, {current_xp} XP, {current_embers} Embers")
+            logger.debug("    • Current state: Level %s, %s XP, %s Embers", current_level, current_xp, current_embers)
 
             msg_cfg = settings.get("message", {})
+            msg_stats = user_data.get("message_stats") or {}
 
-            # Apply channel-specific caps to rewards
-            if channel_id:
-                channel_caps_config = msg_cfg.get("channel_caps", {}).get(channel_id, {})
-                if channel_caps_config:
-                    logger.debug(f"    • Applying channel caps for channel {channel_id}")
-
-                    # Get current cumulative stats for the channel
-                    current_channel_xp = user_data.get("message_stats", {}).get("channel_xp", {}).get(channel_id, 0)
-                    current_channel_embers = user_data.get("message_stats", {}).get("channel_embers", {}).get(channel_id, 0)
-
-                    # Apply XP cap for channel
-                    max_channel_xp = channel_caps_config.get("xp", float('inf'))
-                    if rewards["xp"] > 0 and current_channel_xp + rewards["xp"] > max_channel_xp:
-                        original_xp = rewards["xp"]
-                        rewards["xp"] = max(0, max_channel_xp - current_channel_xp)
-                        if rewards["xp"] < original_xp:
-                            logger.warning(f"    ⚠️  XP capped due to channel {channel_id} limit (U:{user_id}, G:{guild_id}). Original: {original_xp}, Capped: {rewards['xp']}")
-
-                    # Apply Embers cap for channel
-                    max_channel_embers = channel_caps_config.get("embers", float('inf'))
-                    if rewards["embers"] > 0 and current_channel_embers + rewards["embers"] > max_channel_embers:
-                        original_embers = rewards["embers"]
-                        rewards["embers"] = max(0, max_channel_embers - current_channel_embers)
-                        if rewards["embers"] < original_embers:
-                            logger.warning(f"    ⚠️  Embers capped due to channel {channel_id} limit (U:{user_id}, G:{guild_id}). Original: {original_embers}, Capped: {rewards['embers']}")
-
-            # Apply global caps to rewards
-            for cap_type in ["daily", "weekly", "monthly"]:
-                caps = msg_cfg.get(f"{cap_type}_caps", {})
-                if not caps:
-                    continue
-
-                # Get current cumulative stats for the cap type
-                current_xp_stat = user_data.get("message_stats", {}).get(f"{cap_type}_xp", 0)
-                current_embers_stat = user_data.get("message_stats", {}).get(f"{cap_type}_embers", 0)
-
-                # Apply XP cap
-                max_xp = caps.get("xp", float('inf'))
-                if rewards["xp"] > 0 and current_xp_stat + rewards["xp"] > max_xp:
-                    original_xp = rewards["xp"]
-                    rewards["xp"] = max(0, max_xp - current_xp_stat)
-                    if rewards["xp"] < original_xp:
-                        logger.warning(f"    ⚠️  XP capped due to {cap_type} limit (U:{user_id}, G:{guild_id}). Original: {original_xp}, Capped: {rewards['xp']}")
-
-                # Apply Embers cap
-                max_embers = caps.get("embers", float('inf'))
-                if rewards["embers"] > 0 and current_embers_stat + rewards["embers"] > max_embers:
-                    original_embers = rewards["embers"]
-                    rewards["embers"] = max(0, max_embers - current_embers_stat)
-                    if rewards["embers"] < original_embers:
-                        logger.warning(f"    ⚠️  Embers capped due to {cap_type} limit (U:{user_id}, G:{guild_id}). Original: {original_embers}, Capped: {rewards['embers']}")
-
-            # Calculate new totals
-            new_xp = current_xp + rewards.get("xp", 0)
-            new_embers = current_embers + rewards.get("embers", 0)
-
-            logger.debug(f"    • New totals: {new_xp} XP, {new_embers} Embers")
-
-            # Check for level up
-            new_level, leveled_up = self.leveling_system.check_level_up(new_xp, current_level)
+            # Work on local copies of the rewards; written back once caps are applied
+            reward_xp = rewards["xp"]
+            reward_embers = rewards["embers"]
 
-            if leveled_up:
-                logger.info(f"    🎊 LEVEL UP! {current_level} → {new_level}")
+            # Most guilds configure no caps at all; skip the capped path for them
+            channel_caps_config = (msg_cfg.get("channel_caps") or {}).get(channel_id) if channel_id else None
+            global_caps = [
+                (msg_cfg[caps_key], xp_key, embers_key, window_field, cap_type)
+                for caps_key, xp_key, embers_key, window_field, cap_type in _CAP_SPECS
+                if msg_cfg.get(caps_key)
+            ]
 
             # Check and update daily streak
-            logger.debug(f"  🔥 Checking daily streak:")
+            logger.debug("  🔥 Checking daily streak:")
             new_streak_count, should_update_streak = check_and_update_streak(user_data)
             old_streak_count = user_data.get("daily_streak", {}).get("count", 0)
 
@@ -966,127 +1150,133 @@ class MessageLevelingSystem:
             today_key = utc_today_key()
             week_key = utc_week_key()
             month_key = utc_month_key()
+            window_keys = {"today_key": today_key, "week_key": week_key, "month_key": month_key}
 
-            update_data = {
-                "$set": {
-                    "xp": new_xp,
-                    "embers": new_embers,
-                    "level": new_level,
+            if channel_caps_config or global_caps:
+                # Clamp against the caps on the server so concurrent messages can't overshoot them
+                set_fields = {
                     "updated_at": now,
                     "last_rewarded.message": now,
                     "message_stats.last_message_time": now,
                     "message_stats.today_key": today_key,
                     "message_stats.week_key": week_key,
                     "message_stats.month_key": month_key,
-                },
-                "$inc": {
-                    "message_stats.messages": 1,
-                    **({"message_stats.with_attachments": 1} if has_attachments else {}),
-                    **({"message_stats.with_links": 1} if has_links else {}),
-
-                    "message_stats.today_xp": rewards.get("xp", 0),
-                    "message_stats.today_embers": rewards.get("embers", 0),
-                    "message_stats.weekly_xp": rewards.get("xp", 0),
-                    "message_stats.weekly_embers": rewards.get("embers", 0),
-                    "message_stats.monthly_xp": rewards.get("xp", 0),
-                    "message_stats.monthly_embers": rewards.get("embers", 0)
                 }
-            }
+                if should_update_streak:
+                    set_fields.update(create_streak_update_data(new_streak_count))
 
-            if channel_id:
-                update_data["$inc"][f"message_stats.channel_xp.{channel_id}"] = rewards.get("xp", 0)
-                update_data["$inc"][f"message_stats.channel_embers.{channel_id}"] = rewards.get("embers", 0)
-
-            # Update streak if needed
-            if should_update_streak:
-                streak_update = create_streak_update_data(new_streak_count)
-                update_data["$set"].update(streak_update)
+                pipeline = self._build_capped_reward_pipeline(
+                    reward_xp, reward_embers, channel_id, channel_caps_config, global_caps,
+                    window_keys, set_fields, has_attachments, has_links
+                )
+                projection = ["xp", "embers", "level", "message_stats.messages"]
+                projection += [f"message_stats.{field_name}" for spec in _CAP_SPECS for field_name in spec[1:4]]
+                if channel_id:
+                    projection += _channel_counter_paths(channel_id)
 
-            await self.leveling_system.update_user_data(user_id, guild_id, update_data)
+                before = await self.leveling_system.update_user_with_pipeline(
+                    user_id, guild_id, pipeline, projection, create_missing=True
+                )
+                if before is None:
+                    logger.warning("    ⚠️  Failed to apply capped rewards (U:%s, G:%s)", user_id, guild_id)
+                    return None
+
+                # The document as it was when the server applied the caps
+                current_xp = before.get("xp", 0)
+                current_embers = before.get("embers", 0)
+                current_level = before.get("level", 1)
+                msg_stats = before.get("message_stats") or {}
+
+                # Mirror the server-side clamp to learn what was actually awarded
+                reward_xp, reward_embers = self._apply_reward_caps(
+                    user_id, guild_id, msg_stats, reward_xp, reward_embers,
+                    channel_id, channel_caps_config, global_caps, window_keys
+                )
 
-            if leveled_up:
-                try:
-                    # Import the level role checker
-                    from ecom_system.helpers.check_level_role import update_level_role_on_levelup
-
-                    # Check and update level roles
-                    logger.debug(f"🎭 Checking level roles for new level {new_level}")
-                    role_result = await update_level_role_on_levelup(
-                        bot=self.leveling_system.bot,
-                        leveling_system=self.leveling_system,
-                        guild_id=guild_id,
-                        user_id=user_id,
-                        new_level=new_level
-                    )
+                # The pipeline already stored the level for the new XP; this matches it
+                new_xp = current_xp + reward_xp
+                new_embers = current_embers + reward_embers
+                new_level, leveled_up = self.leveling_system.check_level_up(new_xp, current_level)
+            else:
+                # Calculate new totals
+                new_xp = current_xp + reward_xp
+                new_embers = current_embers + reward_embers
+
+                # Check for level up
+                new_level, leveled_up = self.leveling_system.check_level_up(new_xp, current_level)
+
+                # XP and embers are incremented rather than overwritten so concurrent
+                # messages can't lose each other's rewards; level only ever moves up
+                update_data = {
+                    "$set": {
+                        "updated_at": now,
+                        "last_rewarded.message": now,
+                        "message_stats.last_message_time": now,
+                        "message_stats.today_key": today_key,
+                        "message_stats.week_key": week_key,
+                        "message_stats.month_key": month_key,
+                    },
+                    "$inc": {"message_stats.messages": 1, "xp": reward_xp, "embers": reward_embers},
+                    "$max": {"level": new_level}
+                }
 
-                    if role_result.success and role_result.action_taken != "none":
-                        logger.info(f"🎭 Level role update: {role_result.reason}")
-                        if role_result.roles_added:
-                            logger.info(f"  ➕ Added roles: {[r.name for r in role_result.roles_added]}")
-                        if role_result.roles_removed:
-                            logger.info(f"  ➖ Removed roles: {[r.name for r in role_result.roles_removed]}")
-                    elif role_result.error:
-                        logger.warning(f"⚠️ Level role update failed: {role_result.error}")
-                    else:
-                        logger.debug(f"ℹ️ Level roles: {role_result.reason}")
-
-                    if self.level_up_messages:
-                        guild_settings = await self.leveling_system.get_guild_settings(guild_id)
-                        notification_channel = guild_settings.get("notification_channel")
-
-                        if notification_channel:
-                            prestige_level = user_data.get("prestige_level", 0)
-                            reason = LevelUpMessages.determine_reason(current_level, new_level, prestige_level)
-
-                            extra_data = {
-                                "total_xp": new_xp,
-                                "xp_to_next": self.leveling_system.xp_to_next_level(new_level),
-                                "embers": new_embers,
-                                "streak": new_streak_count,
-                                "total_messages": user_data.get("message_stats", {}).get("messages", 0) + 1,
-                                "longest_streak": user_data.get("longest_streak", 0),
-                                "prestige_level": prestige_level
-                            }
-
-                            # Add role information to extra_data if roles were updated
-                            if role_result.success and role_result.action_taken != "none":
-                                extra_data["role_update"] = {
-                                    "action": role_result.action_taken,
-                                    "new_role": role_result.target_role.name if role_result.target_role else None,
-                                    "roles_added": [r.name for r in role_result.roles_added],
-                                    "roles_removed": [r.name for r in role_result.roles_removed]
-                                }
-
-                            # Log BEFORE attempting to send
-                            logger.debug(f"📨 Attempting to send level-up message to channel {notification_channel}")
-
-                            # Send and wait for result
-                            success = await self.level_up_messages.send_level_up_message(
-                                guild_id=guild_id,
-                                user_id=user_id,
-                                old_level=current_level,
-                                new_level=new_level,
-                                channel_id=notification_channel,
-                                reason=reason,
-                                extra_data=extra_data
-                            )
-
-                            if success:
-                                logger.info(f"✅ Level-up message successfully sent to channel {notification_channel}")
-                            else:
-                                logger.warning(f"⚠️ Level-up message failed to send to channel {notification_channel}")
-                        else:
-                            logger.debug(f"ℹ️ No notification channel configured for guild {guild_id}")
+                # Counters left over from an earlier day/week/month restart at this reward;
+                # zero increments are left out
+                for window_field, xp_path, embers_path in _WINDOW_COUNTERS:
+                    if msg_stats.get(window_field) != window_keys[window_field]:
+                        update_data["$set"][xp_path] = reward_xp
+                        update_data["$set"][embers_path] = reward_embers
                     else:
-                        logger.warning(f"⚠️ Level-up message handler not initialized")
-                except Exception as e:
-                    logger.error(f"❌ Failed to send level-up message: {e}", exc_info=True)
+                        if reward_xp:
+                            update_data["$inc"][xp_path] = reward_xp
+                        if reward_embers:
+                            update_data["$inc"][embers_path] = reward_embers
+                if has_attachments:
+                    update_data["$inc"]["message_stats.with_attachments"] = 1
+                if has_links:
+                    update_data["$inc"]["message_stats.with_links"] = 1
+
+                if channel_id:
+                    channel_xp_path, channel_embers_path = _channel_counter_paths(channel_id)
+                    if reward_xp:
+                        update_data["$inc"][channel_xp_path] = reward_xp
+                    if reward_embers:
+                        update_data["$inc"][channel_embers_path] = reward_embers
+
+                # Update streak if needed
+                if should_update_streak:
+                    streak_update = create_streak_update_data(new_streak_count)
+                    update_data["$set"].update(streak_update)
+
+                await self.leveling_system.update_user_data(user_id, guild_id, update_data)
+
+            rewards["xp"] = reward_xp
+            rewards["embers"] = reward_embers
+
+            logger.debug("    • New totals: %s XP, %s Embers", new_xp, new_embers)
+
+            if leveled_up:
+                logger.info("    🎊 LEVEL UP! %s → %s", current_level, new_level)
+                # Roles and the announcement don't affect the stored rewards; run them in the background
+                task = asyncio.create_task(self._handle_level_up(
+                    user_id=user_id,
+                    guild_id=guild_id,
+                    user_data=user_data,
+                    current_level=current_level,
+                    new_level=new_level,
+                    new_xp=new_xp,
+                    new_embers=new_embers,
+                    streak_count=new_streak_count,
+                    total_messages=msg_stats.get("messages", 0) + 1
+                ))
+                self._level_up_tasks.add(task)
+                task.add_done_callback(self._level_up_tasks.discard)
 
             result = {
                 "status": "success",
                 "rewards": {
-                    "xp": rewards.get("xp", 0),
-                    "embers": rewards.get("embers", 0)
+                    "xp": reward_xp,
+                    "embers": reward_embers
                 },
                 "totals": {
                     "xp": new_xp,
@@ -1110,9 +1300,220 @@ class MessageLevelingSystem:
             return result
 
         except Exception as e:
-            logger.error(f"❌ Error processing rewards: {e}")
+            logger.error("❌ Error processing rewards: %s", e)
             return None
 
+    def _apply_reward_caps(self, user_id: str, guild_id: str, msg_stats: Dict[str, Any],
+                           reward_xp: int, reward_embers: int, channel_id: Optional[str],
+                           channel_caps_config: Optional[Dict[str, Any]], global_caps: List[tuple],
+                           window_keys: Dict[str, str]) -> Tuple[int, int]:
+        """
+        Clamp rewards to the channel and daily/weekly/monthly caps.
+
+        Counters whose window key is not the current one count as zero. Must
+        stay in step with _build_capped_reward_pipeline.
+        """
+        # Apply channel-specific caps to rewards
+        if channel_caps_config:
+            logger.debug("    • Applying channel caps for channel %s", channel_id)
+
+            # Get current cumulative stats for the channel
+            current_channel_xp = (msg_stats.get("channel_xp") or {}).get(channel_id, 0)
+            current_channel_embers = (msg_stats.get("channel_embers") or {}).get(channel_id, 0)
+
+            # Apply XP cap for channel
+            max_channel_xp = channel_caps_config.get("xp")
+            if max_channel_xp is not None and reward_xp > 0 and current_channel_xp + reward_xp > max_channel_xp:
+                original_xp = reward_xp
+                reward_xp = max(0, max_channel_xp - current_channel_xp)
+                if reward_xp < original_xp:
+                    logger.warning("    ⚠️  XP capped due to channel %s limit (U:%s, G:%s). Original: %s, Capped: %s", channel_id, user_id, guild_id, original_xp, reward_xp)
+
+            # Apply Embers cap for channel
+            max_channel_embers = channel_caps_config.get("embers")
+            if max_channel_embers is not None and reward_embers > 0 and current_channel_embers + reward_embers > max_channel_embers:
+                original_embers = reward_embers
+                reward_embers = max(0, max_channel_embers - current_channel_embers)
+                if reward_embers < original_embers:
+                    logger.warning("    ⚠️  Embers capped due to channel %s limit (U:%s, G:%s). Original: %s, Capped: %s", channel_id, user_id, guild_id, original_embers, reward_embers)
+
+        # Apply global caps to rewards
+        for caps, xp_key, embers_key, window_field, cap_type in global_caps:
+            # Get current cumulative stats for the cap type, if they belong to the current window
+            in_window = msg_stats.get(window_field) == window_keys[window_field]
+            current_xp_stat = msg_stats.get(xp_key, 0) if in_window else 0
+            current_embers_stat = msg_stats.get(embers_key, 0) if in_window else 0
+
+            # Apply XP cap
+            max_xp = caps.get("xp")
+            if max_xp is not None and reward_xp > 0 and current_xp_stat + reward_xp > max_xp:
+                original_xp = reward_xp
+                reward_xp = max(0, max_xp - current_xp_stat)
+                if reward_xp < original_xp:
+                    logger.warning("    ⚠️  XP capped due to %s limit (U:%s, G:%s). Original: %s, Capped: %s", cap_type, user_id, guild_id, original_xp, reward_xp)
+
+            # Apply Embers cap
+            max_embers = caps.get("embers")
+            if max_embers is not None and reward_embers > 0 and current_embers_stat + reward_embers > max_embers:
+                original_embers = reward_embers
+                reward_embers = max(0, max_embers - current_embers_stat)
+                if reward_embers < original_embers:
+                    logger.warning("    ⚠️  Embers capped due to %s limit (U:%s, G:%s). Original: %s, Capped: %s", cap_type, user_id, guild_id, original_embers, reward_embers)
+
+        return reward_xp, reward_embers
+
+    def _build_capped_reward_pipeline(self, reward_xp: int, reward_embers: int, channel_id: Optional[str],
+                                      channel_caps_config: Optional[Dict[str, Any]], global_caps: List[tuple],
+                                      window_keys: Dict[str, str], set_fields: Dict[str, Any],
+                                      has_attachments: bool, has_links: bool) -> List[Dict[str, Any]]:
+        """
+        Build an update pipeline that clamps the rewards to the configured caps
+        and applies them in the same server-side write.
+
+        The awarded amounts are min(reward, cap - current) over every cap,
+        floored at zero, which is what _apply_reward_caps computes in Python.
+        """
+        def counter(path: str):
+            return {"$ifNull": [f"${path}", 0]}
+
+        def window_counter(path: str, window_field: str):
+            # Counters from an earlier day/week/month no longer count towards the cap
+            return {"$cond": [
+                {"$eq": [f"$message_stats.{window_field}", window_keys[window_field]]}, counter(path), 0
+            ]}
+
+        channel_xp_path, channel_embers_path = _channel_counter_paths(channel_id) if channel_id else (None, None)
+
+        xp_limits = [reward_xp]
+        embers_limits = [reward_embers]
+        if channel_caps_config:
+            if channel_caps_config.get("xp") is not None:
+                xp_limits.append({"$subtract": [channel_caps_config["xp"], counter(channel_xp_path)]})
+            if channel_caps_config.get("embers") is not None:
+                embers_limits.append({"$subtract": [channel_caps_config["embers"], counter(channel_embers_path)]})
+        for caps, xp_key, embers_key, window_field, _ in global_caps:
+            if caps.get("xp") is not None:
+                xp_limits.append({"$subtract": [caps["xp"], window_counter(f"message_stats.{xp_key}", window_field)]})
+            if caps.get("embers") is not None:
+                embers_limits.append({"$subtract": [caps["embers"], window_counter(f"message_stats.{embers_key}", window_field)]})
+
+        award_xp = "$_capped_award_xp"
+        award_embers = "$_capped_award_embers"
+
+        new_xp = {"$add": [{"$ifNull": ["$xp", 0]}, award_xp]}
+
+        applied = {
+            "xp": new_xp,
+            "embers": {"$add": [{"$ifNull": ["$embers", 0]}, award_embers]},
+            # Levels only ever go up, as with check_level_up
+            "level": {"$max": [
+                {"$ifNull": ["$level", 1]}, self.leveling_system.level_for_xp_expression(new_xp)
+            ]},
+            "message_stats.messages": {"$add": [counter("message_stats.messages"), 1]},
+        }
+        if has_attachments:
+            applied["message_stats.with_attachments"] = {"$add": [counter("message_stats.with_attachments"), 1]}
+        if has_links:
+            applied["message_stats.with_links"] = {"$add": [counter("message_stats.with_links"), 1]}
+        for window_field, xp_path, embers_path in _WINDOW_COUNTERS:
+            applied[xp_path] = {"$add": [window_counter(xp_path, window_field), award_xp]}
+            applied[embers_path] = {"$add": [window_counter(embers_path, window_field), award_embers]}
+        if channel_id:
+            applied[channel_xp_path] = {"$add": [counter(channel_xp_path), award_xp]}
+            applied[channel_embers_path] = {"$add": [counter(channel_embers_path), award_embers]}
+        for path, value in set_fields.items():
+            applied[path] = {"$literal": value}
+
+        return [
+            {"$set": {
+                "_capped_award_xp": {"$max": [0, {"$min": xp_limits}]},
+                "_capped_award_embers": {"$max": [0, {"$min": embers_limits}]},
+            }},
+            {"$set": applied},
+            {"$unset": ["_capped_award_xp", "_capped_award_embers"]},
+        ]
+
+    async def _handle_level_up(self, user_id: str, guild_id: str, user_data: Dict[str, Any],
+                               current_level: int, new_level: int, new_xp: int, new_embers: int,
+                               streak_count: int, total_messages: int):
+        """Update level roles and send the level-up announcement after rewards are saved."""
+        try:
+            # Import the level role checker
+            from ecom_system.helpers.check_level_role import update_level_role_on_levelup
+
+            # Check and update level roles
+            logger.debug(f"🎭 Checking level roles for new level {new_level}")
+            role_result = await update_level_role_on_levelup(
+                bot=self.leveling_system.bot,
+                leveling_system=self.leveling_system,
+                guild_id=guild_id,
+                user_id=user_id,
+                new_level=new_level
+            )
+
+            if role_result.success and role_result.action_taken != "none":
+                logger.info(f"🎭 Level role update: {role_result.reason}")
+                if role_result.roles_added:
+                    logger.info(f"  ➕ Added roles: {[r.name for r in role_result.roles_added]}")
+                if role_result.roles_removed:
+                    logger.info(f"  ➖ Removed roles: {[r.name for r in role_result.roles_removed]}")
+            elif role_result.error:
+                logger.warning(f"⚠️ Level role update failed: {role_result.error}")
+            else:
+                logger.debug(f"ℹ️ Level roles: {role_result.reason}")
+
+            if self.level_up_messages:
+                guild_settings = await self.leveling_system.get_guild_settings(guild_id)
+                notification_channel = guild_settings.get("notification_channel")
+
+                if notification_channel:
+                    prestige_level = user_data.get("prestige_level", 0)
+                    reason = LevelUpMessages.determine_reason(current_level, new_level, prestige_level)
+
+                    extra_data = {
+                        "total_xp": new_xp,
+                        "xp_to_next": self.leveling_system.xp_to_next_level(new_level),
+                        "embers": new_embers,
+                        "streak": streak_count,
+                        "total_messages": total_messages,
+                        "longest_streak": user_data.get("longest_streak", 0),
+                        "prestige_level": prestige_level
+                    }
+
+                    # Add role information to extra_data if roles were updated
+                    if role_result.success and role_result.action_taken != "none":
+                        extra_data["role_update"] = {
+                            "action": role_result.action_taken,
+                            "new_role": role_result.target_role.name if role_result.target_role else None,
+                            "roles_added": [r.name for r in role_result.roles_added],
+                            "roles_removed": [r.name for r in role_result.roles_removed]
+                        }
+
+                    # Log BEFORE attempting to send
+                    logger.debug(f"📨 Attempting to send level-up message to channel {notification_channel}")
+
+                    # Send and wait for result
+                    success = await self.level_up_messages.send_level_up_message(
+                        guild_id=guild_id,
+                        user_id=user_id,
+                        old_level=current_level,
+                        new_level=new_level,
+                        channel_id=notification_channel,
+                        reason=reason,
+                        extra_data=extra_data
+                    )
+
+                    if success:
+                        logger.info(f"✅ Level-up message successfully sent to channel {notification_channel}")
+                    else:
+                        logger.warning(f"⚠️ Level-up message failed to send to channel {notification_channel}")
+                else:
+                    logger.debug(f"ℹ️ No notification channel configured for guild {guild_id}")
+            else:
+                logger.warning(f"⚠️ Level-up message handler not initialized")
+        except Exception as e:
+            logger.error(f"❌ Failed to send level-up message: {e}", exc_info=True)
+
     async def log_anti_cheat_violation(self, user_id: str, guild_id: str, activity_type: str, reason: str):
         """Log anti-cheat violation - placeholder for shared helper"""
         logger.warning(f"🚫 Anti-cheat violation: U:{user_id} in G:{guild_id} - Type: {activity_type}, Reason: {reason}")
\ No newline at end of file
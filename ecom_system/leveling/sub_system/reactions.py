@@ -1,12 +1,61 @@
+import asyncio
 import discord
 import logging
-from typing import Dict, Any
-from datetime import timezone
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
 
 from ecom_system.helpers.helpers import utc_now_ts
 
 logger = logging.getLogger(__name__)
 
+# How long a guild's reaction settings are reused before re-reading them
+SETTINGS_CACHE_TTL_SECONDS = 30
+
+
+# Reaction multipliers are kept as integers in thousandths (1500 == 1.5x)
+MULTIPLIER_SCALE = 1000
+
+
+def _to_milli(multiplier: float) -> int:
+    """Convert a settings multiplier to integer thousandths."""
+    return int(round(multiplier * MULTIPLIER_SCALE))
+
+
+def _scale_reward(base: int, multiplier_product: int, scale: int) -> int:
+    """Apply a product of milli multipliers to a milli-scaled base reward, rounding half up."""
+    return (base * multiplier_product + scale // 2) // scale
+
+
+@dataclass
+class ReactionBonuses:
+    """
+    Reaction reward multipliers resolved once per guild settings load, stored
+    in thousandths so the reward math stays in integers.
+    """
+    fast_reaction_bonus: int = MULTIPLIER_SCALE
+    custom_emoji_bonus: int = MULTIPLIER_SCALE
+    unique_emoji_bonus: int = MULTIPLIER_SCALE
+    chain_bonus: int = MULTIPLIER_SCALE
+    reaction_diversity_bonus: int = MULTIPLIER_SCALE
+    emoji_bonuses: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "ReactionBonuses":
+        """Build from the guild's `reaction` settings section."""
+        return cls(
+            fast_reaction_bonus=_to_milli(settings.get("fast_reaction_bonus", 1.0)),
+            custom_emoji_bonus=_to_milli(settings.get("custom_emoji_bonus", 1.0)),
+            unique_emoji_bonus=_to_milli(settings.get("unique_emoji_bonus", 1.0)),
+            chain_bonus=_to_milli(settings.get("chain_bonus", 1.0)),
+            reaction_diversity_bonus=_to_milli(settings.get("reaction_diversity_bonus", 1.0)),
+            emoji_bonuses={
+                emoji: _to_milli(bonus)
+                for emoji, bonus in (settings.get("emoji_bonuses") or {}).items()
+            }
+        )
+
+
 class ReactionLevelingSystem:
     """
     Handles processing reactions for the leveling system, including rewards and stats,
@@ -18,6 +67,9 @@ class ReactionLevelingSystem:
         self.leveling_system = leveling_system
         self.logger = logger
 
+        # Per-guild reaction settings: guild_id -> (expires_at, settings, bonuses)
+        self._settings_cache: Dict[str, Tuple[float, Dict[str, Any], ReactionBonuses]] = {}
+
     async def process_reaction(self, reaction: discord.Reaction, reactor: discord.User):
         """
         Processes a reaction event, incrementing stats and distributing rewards based on detailed settings.
@@ -31,8 +83,7 @@ class ReactionLevelingSystem:
             
         guild_id = str(guild.id)
         
-        settings_full = await self.leveling_system.ls_reaction.find_one({"guild_id": guild_id})
-        settings = settings_full.get("reaction", {}) if settings_full else {}
+        settings, bonuses = await self._get_settings(guild_id)
 
         # Self-reaction check from settings
         if settings.get("self_reaction_disabled", True) and reactor.id == message_owner.id:
@@ -44,100 +95,140 @@ class ReactionLevelingSystem:
             return
 
         now = utc_now_ts()
-        
-        # Process rewards for both reactor and owner
-        await self._process_reactor_rewards(reactor, guild_id, reaction, now, settings)
-        await self._process_owner_rewards(message_owner, guild_id, reaction, now, settings)
+        reactor_id = str(reactor.id)
+        owner_id = str(message_owner.id)
 
-    async def _increment_stats_only(self, reactor_id: str, message_owner_id: str, guild_id: str):
-        """Increments reaction counts when the reward system is disabled."""
-        # Ensure reactor profile exists and increment their count
-        await self.leveling_system.get_enhanced_user_data(reactor_id, guild_id)
-        await self.leveling_system.update_user_data(
-            reactor_id, guild_id, {"$inc": {"message_stats.reacted_messages": 1}}
-        )
-        
-        # Ensure owner profile exists and increment their count
-        await self.leveling_system.get_enhanced_user_data(message_owner_id, guild_id)
-        await self.leveling_system.update_user_data(
-            message_owner_id, guild_id, {"$inc": {"message_stats.got_reactions": 1}}
+        # Load both profiles concurrently, then write both updates in one round trip
+        reactor_data, owner_data = await self._load_profiles(reactor_id, owner_id, guild_id)
+        reactor_settings = settings.get("reactor", {})
+        owner_settings = settings.get("owner", {})
+
+        # Check cooldowns first; users still on cooldown only get their counter bumped
+        if self._cooldown_elapsed(reactor_data, "give_reaction", now, reactor_settings):
+            reactor_update = self._process_reactor_rewards(reaction, now, reactor_settings, bonuses)
+        else:
+            reactor_update = {"$inc": {"message_stats.reacted_messages": 1}}
+
+        if self._cooldown_elapsed(owner_data, "got_reaction", now, owner_settings):
+            owner_update = self._process_owner_rewards(reaction, now, owner_settings, bonuses)
+        else:
+            owner_update = {"$inc": {"message_stats.got_reactions": 1}}
+
+        await self.leveling_system.bulk_update_user_data([
+            (reactor_id, guild_id, reactor_update),
+            (owner_id, guild_id, owner_update)
+        ], create_missing=True)
+        self.logger.debug("Processed reaction rewards for G:%s U:%s -> U:%s", guild_id, reactor_id, owner_id)
+
+    async def _get_settings(self, guild_id: str) -> Tuple[Dict[str, Any], ReactionBonuses]:
+        """
+        Return the guild's reaction settings and resolved bonuses, re-reading
+        them once the cached copy expires.
+        """
+        now = time.time()
+        cached = self._settings_cache.get(guild_id)
+        if cached and cached[0] > now:
+            return cached[1], cached[2]
+
+        settings_full = await self.leveling_system.ls_reaction.find_one({"guild_id": guild_id})
+        settings = settings_full.get("reaction", {}) if settings_full else {}
+        bonuses = ReactionBonuses.from_settings(settings)
+        self._settings_cache[guild_id] = (now + SETTINGS_CACHE_TTL_SECONDS, settings, bonuses)
+        return settings, bonuses
+
+    def invalidate_settings(self, guild_id: Optional[str] = None):
+        """Drop cached reaction settings for one guild, or for every guild when no id is given."""
+        if guild_id is None:
+            self._settings_cache.clear()
+        else:
+            self._settings_cache.pop(str(guild_id), None)
+
+    async def _load_profiles(self, reactor_id: str, owner_id: str, guild_id: str):
+        """
+        Fetch the reward-relevant fields of the reactor and owner profiles concurrently.
+
+        A user without a profile yet comes back as an empty dict; the reward
+        update then creates the profile through its upsert.
+        """
+        if reactor_id == owner_id:
+            user_data = await self.leveling_system.get_user_reward_view(reactor_id, guild_id) or {}
+            return user_data, user_data
+
+        reactor_data, owner_data = await asyncio.gather(
+            self.leveling_system.get_user_reward_view(reactor_id, guild_id),
+            self.leveling_system.get_user_reward_view(owner_id, guild_id)
         )
-        self.logger.debug(f"Reaction stats updated for G:{guild_id} U:{reactor_id} and U:{message_owner_id} (rewards disabled)")
+        return reactor_data or {}, owner_data or {}
 
-    async def _process_reactor_rewards(self, reactor: discord.User, guild_id: str, reaction: discord.Reaction, now: float, settings: Dict[str, Any]):
-        """Calculates and applies rewards for the user who added the reaction."""
-        reactor_id = str(reactor.id)
-        reactor_settings = settings.get("reactor", {})
-        
-        reactor_data = await self.leveling_system.get_enhanced_user_data(reactor_id, guild_id)
+    async def _increment_stats_only(self, reactor_id: str, message_owner_id: str, guild_id: str):
+        """Increments reaction counts when the reward system is disabled."""
+        # Increment both counts in one round trip, creating either profile if it doesn't exist yet
+        await self.leveling_system.bulk_update_user_data([
+            (reactor_id, guild_id, {"$inc": {"message_stats.reacted_messages": 1}}),
+            (message_owner_id, guild_id, {"$inc": {"message_stats.got_reactions": 1}})
+        ], create_missing=True)
+        self.logger.debug("Reaction stats updated for G:%s U:%s and U:%s (rewards disabled)", guild_id, reactor_id, message_owner_id)
+
+    @staticmethod
+    def _cooldown_elapsed(user_data: Dict[str, Any], key: str, now: float, role_settings: Dict[str, Any]) -> bool:
+        """Whether the user's `last_rewarded.<key>` is older than the configured cooldown."""
+        cooldown = role_settings.get("cooldown_seconds", 60)
+        return (now - user_data.get("last_rewarded", {}).get(key, 0)) > cooldown
+
+    def _process_reactor_rewards(self, reaction: discord.Reaction, now: float, reactor_settings: Dict[str, Any], bonuses: ReactionBonuses) -> Dict[str, Any]:
+        """Calculates the reward update for the user who added the reaction, once off cooldown."""
         update_reactor = {"$inc": {"message_stats.reacted_messages": 1}}
 
-        cooldown = reactor_settings.get("cooldown_seconds", 60)
-        
-        if reactor_data and (now - reactor_data.get("last_rewarded", {}).get("give_reaction", 0)) > cooldown:
-            base_xp = reactor_settings.get("xp", 0)
-            base_embers = reactor_settings.get("embers", 0)
-            
-            total_multiplier = 1.0
+        # Base rewards are milli-scaled too, so fractional settings aren't truncated
+        base_xp = _to_milli(reactor_settings.get("xp", 0))
+        base_embers = _to_milli(reactor_settings.get("embers", 0))
 
-            # Fast reaction bonus (within 60 seconds of message)
-            time_since_message = (discord.utils.utcnow().replace(tzinfo=timezone.utc) - reaction.message.created_at).total_seconds()
-            if time_since_message < 60:
-                total_multiplier *= settings.get("fast_reaction_bonus", 1.0)
+        time_since_message = now - reaction.message.created_at.timestamp()
 
+        # Product of four milli multipliers; with the milli base the combined scale is 1000^5
+        total_multiplier = (
+            # Fast reaction bonus (within 60 seconds of message)
+            (bonuses.fast_reaction_bonus if time_since_message < 60 else MULTIPLIER_SCALE)
             # Custom emoji bonus
-            if isinstance(reaction.emoji, discord.Emoji):
-                total_multiplier *= settings.get("custom_emoji_bonus", 1.0)
-            
+            * (bonuses.custom_emoji_bonus if isinstance(reaction.emoji, discord.Emoji) else MULTIPLIER_SCALE)
             # Unique emoji on this message bonus (first to use this emoji)
-            if reaction.count == 1:
-                total_multiplier *= settings.get("unique_emoji_bonus", 1.0)
-            
+            * (bonuses.unique_emoji_bonus if reaction.count == 1 else MULTIPLIER_SCALE)
             # Specific emoji bonuses
-            emoji_str = str(reaction.emoji)
-            if emoji_str in settings.get("emoji_bonuses", {}):
-                total_multiplier *= settings["emoji_bonuses"][emoji_str]
+            * bonuses.emoji_bonuses.get(str(reaction.emoji), MULTIPLIER_SCALE)
+        )
+        scale = MULTIPLIER_SCALE ** 5
 
-            final_xp = base_xp * total_multiplier
-            final_embers = base_embers * total_multiplier
+        final_xp = _scale_reward(base_xp, total_multiplier, scale)
+        final_embers = _scale_reward(base_embers, total_multiplier, scale)
 
-            if final_xp > 0: update_reactor["$inc"]["xp"] = round(final_xp)
-            if final_embers > 0: update_reactor["$inc"]["embers"] = round(final_embers)
-            update_reactor.setdefault("$set", {})["last_rewarded.give_reaction"] = now
-        
-        await self.leveling_system.update_user_data(reactor_id, guild_id, update_reactor)
-        self.logger.debug(f"Processed reactor rewards for G:{guild_id} U:{reactor_id}")
+        if final_xp > 0: update_reactor["$inc"]["xp"] = final_xp
+        if final_embers > 0: update_reactor["$inc"]["embers"] = final_embers
+        update_reactor["$set"] = {"last_rewarded.give_reaction": now}
 
-    async def _process_owner_rewards(self, owner: discord.User, guild_id: str, reaction: discord.Reaction, now: float, settings: Dict[str, Any]):
-        """Calculates and applies rewards for the message owner."""
-        owner_id = str(owner.id)
-        owner_settings = settings.get("owner", {})
-        
-        owner_data = await self.leveling_system.get_enhanced_user_data(owner_id, guild_id)
-        update_owner = {"$inc": {"message_stats.got_reactions": 1}}
-        
-        cooldown = owner_settings.get("cooldown_seconds", 60)
+        return update_reactor
 
-        if owner_data and (now - owner_data.get("last_rewarded", {}).get("got_reaction", 0)) > cooldown:
-            base_xp = owner_settings.get("xp", 0)
-            base_embers = owner_settings.get("embers", 0)
+    def _process_owner_rewards(self, reaction: discord.Reaction, now: float, owner_settings: Dict[str, Any], bonuses: ReactionBonuses) -> Dict[str, Any]:
+        """Calculates the reward update for the message owner, once off cooldown."""
+        update_owner = {"$inc": {"message_stats.got_reactions": 1}}
 
-            total_multiplier = 1.0
+        # Base rewards are milli-scaled too, so fractional settings aren't truncated
+        base_xp = _to_milli(owner_settings.get("xp", 0))
+        base_embers = _to_milli(owner_settings.get("embers", 0))
 
+        # Product of two milli multipliers; with the milli base the combined scale is 1000^3
+        total_multiplier = (
             # Chain bonus (if more than one person has used this emoji)
-            if reaction.count > 1:
-                total_multiplier *= settings.get("chain_bonus", 1.0)
-            
+            (bonuses.chain_bonus if reaction.count > 1 else MULTIPLIER_SCALE)
             # Diversity bonus (if more than one unique emoji is on the message)
-            if len(reaction.message.reactions) > 1:
-                total_multiplier *= settings.get("reaction_diversity_bonus", 1.0)
-            
-            final_xp = base_xp * total_multiplier
-            final_embers = base_embers * total_multiplier
-            
-            if final_xp > 0: update_owner["$inc"]["xp"] = round(final_xp)
-            if final_embers > 0: update_owner["$inc"]["embers"] = round(final_embers)
-            update_owner.setdefault("$set", {})["last_rewarded.got_reaction"] = now
+            * (bonuses.reaction_diversity_bonus if len(reaction.message.reactions) > 1 else MULTIPLIER_SCALE)
+        )
+        scale = MULTIPLIER_SCALE ** 3
+
+        final_xp = _scale_reward(base_xp, total_multiplier, scale)
+        final_embers = _scale_reward(base_embers, total_multiplier, scale)
+
+        if final_xp > 0: update_owner["$inc"]["xp"] = final_xp
+        if final_embers > 0: update_owner["$inc"]["embers"] = final_embers
+        update_owner["$set"] = {"last_rewarded.got_reaction": now}
 
-        await self.leveling_system.update_user_data(owner_id, guild_id, update_owner)
-        self.logger.debug(f"Processed owner rewards for G:{guild_id} U:{owner_id}")
\ No newline at end of file
+        return update_owner
@@ -1,14 +1,18 @@
 import logging
+import math
 import time
 import asyncio
-from typing import Dict, Any, Tuple, Optional
+import heapq
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime, timezone
 
 from discord import VoiceState
 
 from ecom_system.Listeners.VoiceSessions import VoiceSession
 from ecom_system.helpers.check_level_role import update_level_role_on_levelup
-from ecom_system.helpers.helpers import utc_now_ts, utc_today_key, utc_week_key, utc_month_key
+from ecom_system.helpers.helpers import utc_now_ts, utc_period_keys
 from ecom_system.helpers.leveled_up import LevelUpMessages
 from ecom_system.helpers.rate_limiter import rate_limiter
 from ecom_system.helpers.daily_streak import check_and_update_streak, create_streak_update_data
@@ -16,7 +20,124 @@ from loggers.log_factory import log_performance, PerformanceLogger
 
 logger = logging.getLogger(__name__)
 
-# Import the VoiceSession class
+# Finished sessions kept around for reuse by the next join
+SESSION_POOL_SIZE = 1024
+
+# Stale sessions are swept lazily from voice events, at most this often
+STALE_SWEEP_INTERVAL_SECONDS = 300
+
+# A session with no voice event for this long is treated as a missed leave
+STALE_SESSION_SECONDS = 600
+
+# Sessions worth less XP than this earn nothing, which skips the profile write
+MIN_REWARD_XP = 2
+
+# How long merged guild settings are reused before being re-read from MongoDB
+SETTINGS_CACHE_TTL_SECONDS = 60
+
+# Cached per-user rate limit key prefixes; the cache is dropped once it grows past this
+RATE_LIMIT_PREFIX_CACHE_SIZE = 4096
+
+# (label, settings caps key, voice_stats window key field, xp counter, embers counter)
+_VOICE_CAP_SPECS = (
+    ("daily", "daily_caps", "today_key", "today_xp", "today_embers"),
+    ("weekly", "weekly_caps", "week_key", "weekly_xp", "weekly_embers"),
+    ("monthly", "monthly_caps", "month_key", "monthly_xp", "monthly_embers"),
+)
+
+# (session metric, voice_stats counter) pairs added to the profile when a session ends
+_VOICE_METRIC_INC_KEYS = (
+    ("voice_seconds", "voice_stats.voice_seconds"),
+    ("active_seconds", "voice_stats.active_seconds"),
+    ("muted_time", "voice_stats.muted_time"),
+    ("deafened_time", "voice_stats.deafened_time"),
+    ("self_muted_time", "voice_stats.self_muted_time"),
+    ("self_deafened_time", "voice_stats.self_deafened_time"),
+)
+
+# (label, voice_stats window key field, window key path, xp counter path, embers counter path),
+# in the same order as utc_period_keys() returns the current keys
+_VOICE_PERIOD_COUNTERS = (
+    ("Daily", "today_key", "voice_stats.today_key", "voice_stats.today_xp", "voice_stats.today_embers"),
+    ("Weekly", "week_key", "voice_stats.week_key", "voice_stats.weekly_xp", "voice_stats.weekly_embers"),
+    ("Monthly", "month_key", "voice_stats.month_key", "voice_stats.monthly_xp", "voice_stats.monthly_embers"),
+)
+
+
+_SNOWFLAKE_MASK = (1 << 64) - 1
+
+
+def _session_key(guild_id: str, user_id: str) -> int:
+    """Pack a guild and user snowflake into a single int key for the session map."""
+    return (int(guild_id) << 64) | int(user_id)
+
+
+def _split_session_key(session_key: int) -> Tuple[str, str]:
+    """Unpack a session key back into (guild_id, user_id) strings."""
+    return str(session_key >> 64), str(session_key & _SNOWFLAKE_MASK)
+
+
+@dataclass(slots=True)
+class VoiceRewardConfig:
+    """
+    The settings.voice reward knobs for a guild, resolved once per settings
+    load so per-session reward math reads attributes instead of dict keys.
+    """
+    xp_per_min: float = 6
+    embers_per_min: float = 4
+    channel_bonuses: Dict[str, float] = field(default_factory=dict)
+    screen_share_bonus: float = 1.0
+    camera_bonus: float = 1.0
+    participant_bonus_enabled: bool = False
+    participant_min_time_seconds: float = 60
+    participant_bonus_threshold: int = 3
+    participant_bonus_per_person: float = 0.05
+    participant_bonus_max: float = 1.5
+    # Configured caps only, as (label, xp_cap, embers_cap, window_field, xp_field, embers_field);
+    # a cap missing from a configured period is math.inf
+    cap_periods: Tuple[Tuple[str, float, float, str, str, str], ...] = ()
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "VoiceRewardConfig":
+        """Build from merged guild settings, falling back to defaults."""
+        voice_cfg = settings.get("voice", {})
+        defaults = cls()
+        return cls(
+            xp_per_min=voice_cfg.get("xp_per_min", defaults.xp_per_min),
+            embers_per_min=voice_cfg.get("embers_per_min", defaults.embers_per_min),
+            channel_bonuses=voice_cfg.get("channel_bonuses") or {},
+            screen_share_bonus=voice_cfg.get("screen_share_bonus", defaults.screen_share_bonus),
+            camera_bonus=voice_cfg.get("camera_bonus", defaults.camera_bonus),
+            participant_bonus_enabled=bool(voice_cfg.get("participant_bonus_enabled", False)),
+            participant_min_time_seconds=voice_cfg.get(
+                "participant_min_time_seconds", defaults.participant_min_time_seconds),
+            participant_bonus_threshold=voice_cfg.get(
+                "participant_bonus_threshold", defaults.participant_bonus_threshold),
+            participant_bonus_per_person=voice_cfg.get(
+                "participant_bonus_per_person", defaults.participant_bonus_per_person),
+            participant_bonus_max=voice_cfg.get("participant_bonus_max", defaults.participant_bonus_max),
+            cap_periods=tuple(
+                (label, voice_cfg[caps_key].get("xp", math.inf), voice_cfg[caps_key].get("embers", math.inf),
+                 window_field, xp_field, embers_field)
+                for label, caps_key, window_field, xp_field, embers_field in _VOICE_CAP_SPECS
+                if voice_cfg.get(caps_key)
+            ),
+        )
+
+
+@dataclass(slots=True)
+class VoiceRewards:
+    """XP and Embers earned by a voice session, before or after caps."""
+    xp: float = 0.0
+    embers: float = 0.0
+    multipliers: Dict[str, float] = field(default_factory=dict)
+    capped: bool = False
+    original_xp: float = 0.0
+    original_embers: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict form for consumers outside the voice subsystem."""
+        return asdict(self)
 
 
 class VoiceLevelingSystem:
@@ -32,36 +153,79 @@ class VoiceLevelingSystem:
         self.logger = logger
 
         # Active voice sessions: (guild_id, user_id) -> VoiceSession
-        self.voice_sessions: Dict[Tuple[str, str], VoiceSession] = {}
+        self.voice_sessions: Dict[int, VoiceSession] = {}
+
+        # (last_update_time, session_key) min-heap so the stale sweep only visits
+        # expired entries; entries whose time no longer matches the session are skipped
+        self._activity_heap: list = []
 
-        # Session cleanup task
-        self._cleanup_task = None
+        # Recycled VoiceSession objects, refilled as sessions end
+        self._session_pool: deque = deque(maxlen=SESSION_POOL_SIZE)
+
+        # Merged guild settings: guild_id -> (expires_at, settings, voice reward config)
+        self._settings_cache: Dict[str, Tuple[float, Dict[str, Any], VoiceRewardConfig]] = {}
+        # Settings reads currently in flight, so concurrent misses await the same one
+        self._settings_loads: Dict[str, asyncio.Future] = {}
+
+        # Bound achievement check, resolved in initialize(); the parent builds
+        # its achievement system after us
+        self._check_achievements = None
+
+        # When stale sessions were last swept (see _maybe_sweep_stale_sessions)
+        self._last_stale_sweep = 0.0
+
+        # Voice rate limit key prefixes: session key -> "rate_limit:{guild}:{user}:voice:"
+        self._rl_prefix: Dict[int, str] = {}
 
     async def initialize(self):
-        """Initialize voice system and start cleanup task."""
-        try:
-            # Start background cleanup task
-            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
-            logger.info("✅ VoiceLevelingSystem initialized with periodic cleanup")
-        except Exception as e:
-            logger.error(f"❌ VoiceLevelingSystem initialization failed: {e}")
+        """Initialize voice system. Stale sessions are swept lazily from voice events."""
+        self._last_stale_sweep = time.monotonic()
+        achievement_system = getattr(self.leveling_system, "achievement_system", None)
+        self._check_achievements = achievement_system.check_and_update_achievements if achievement_system else None
+        logger.info("✅ VoiceLevelingSystem initialized")
 
     async def shutdown(self):
         """Shutdown voice system and cleanup resources."""
         try:
-            if self._cleanup_task:
-                self._cleanup_task.cancel()
-                try:
-                    await self._cleanup_task
-                except asyncio.CancelledError:
-                    pass
-
             # Process any remaining active sessions
             await self._cleanup_all_sessions()
             logger.info("✅ VoiceLevelingSystem shutdown complete")
         except Exception as e:
             logger.error(f"❌ VoiceLevelingSystem shutdown error: {e}")
 
+    async def _get_settings(self, guild_id: str) -> Tuple[Dict[str, Any], VoiceRewardConfig]:
+        """
+        Return the guild's merged leveling settings and resolved voice reward
+        config, re-reading them once the cached copy expires.
+        """
+        cached = self._settings_cache.get(guild_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1], cached[2]
+
+        # Sessions ending together (e.g. a batch of stale ones) share one read
+        load = self._settings_loads.get(guild_id)
+        if load is None:
+            load = asyncio.ensure_future(self._load_settings(guild_id))
+            self._settings_loads[guild_id] = load
+            load.add_done_callback(lambda _: self._settings_loads.pop(guild_id, None))
+        return await asyncio.shield(load)
+
+    async def _load_settings(self, guild_id: str) -> Tuple[Dict[str, Any], VoiceRewardConfig]:
+        """Read the guild's settings and cache them with their resolved voice config."""
+        settings = await self.leveling_system.get_guild_settings(guild_id)
+        config = VoiceRewardConfig.from_settings(settings)
+        if settings:
+            # Don't pin the empty fallback returned on a failed read
+            self._settings_cache[guild_id] = (time.monotonic() + SETTINGS_CACHE_TTL_SECONDS, settings, config)
+        return settings, config
+
+    def invalidate_settings(self, guild_id: Optional[str] = None):
+        """Drop cached settings for one guild, or for every guild when no id is given."""
+        if guild_id is None:
+            self._settings_cache.clear()
+        else:
+            self._settings_cache.pop(str(guild_id), None)
+
     @log_performance("process_voice_state_update")
     async def process_voice_state_update(
             self,
@@ -74,11 +238,25 @@ class VoiceLevelingSystem:
         Process a voice state update to manage sessions and calculate rewards.
         Integrated with main leveling system structure.
         """
-        start_time = time.time()
-        session_key = (guild_id, user_id)
-        current_time = time.time()
-
-        logger.info(f"🔄 Processing voice state update: G:{guild_id} U:{user_id}")
+        # Discord also sends updates for changes we don't track (suppress,
+        # request-to-speak, ...); nothing to do when none of our fields moved
+        if (
+                before.channel == after.channel
+                and before.mute == after.mute
+                and before.deaf == after.deaf
+                and before.self_mute == after.self_mute
+                and before.self_deaf == after.self_deaf
+                and before.self_stream == after.self_stream
+                and before.self_video == after.self_video
+        ):
+            return
+
+        start_time = time.monotonic()
+        session_key = _session_key(guild_id, user_id)
+        # Session clock; wall-clock time is only taken when rewards are written
+        current_time = start_time
+
+        logger.debug("🔄 Processing voice state update: G:%s U:%s", guild_id, user_id)
 
         try:
             # User joins a voice channel or moves between channels
@@ -93,25 +271,28 @@ class VoiceLevelingSystem:
             elif before.channel is not None and after.channel is not None and before.channel == after.channel:
                 await self._handle_voice_state_change(session_key, user_id, guild_id, after, current_time)
 
-            processing_time = (time.time() - start_time) * 1000
-            logger.debug(f"✅ Voice state update processed in {processing_time:.2f}ms")
+            await self._maybe_sweep_stale_sessions(current_time)
+
+            processing_time = (time.monotonic() - start_time) * 1000
+            logger.debug("✅ Voice state update processed in %.2fms", processing_time)
 
         except Exception as e:
             logger.error(f"❌ Error processing voice state update: {e}", exc_info=True)
 
-    async def _handle_voice_join(self, session_key: Tuple[str, str], user_id: str, guild_id: str,
+    async def _handle_voice_join(self, session_key: int, user_id: str, guild_id: str,
                                  after: VoiceState, current_time: float):
         """Handle user joining a voice channel."""
-        if session_key not in self.voice_sessions:
+        session = self.voice_sessions.get(session_key)
+        if session is None:
             # New session - user joins for the first time
             channel_id = str(after.channel.id) if after.channel else None
 
             # Count non-bot members in the channel
             participant_count = 0
             if after.channel:
-                participant_count = len([m for m in after.channel.members if not m.bot])
+                participant_count = sum(1 for m in after.channel.members if not m.bot)
 
-            session = VoiceSession(
+            session = self._acquire_session(
                 start_time=current_time,
                 channel_id=channel_id,
                 participant_count=participant_count,
@@ -123,8 +304,9 @@ class VoiceLevelingSystem:
                 is_video=after.self_video,
             )
             self.voice_sessions[session_key] = session
-            logger.info(f"🎤 Voice session started for U:{user_id} in G:{guild_id} "
-                        f"(channel: {after.channel.name}, ID: {channel_id}, participants: {participant_count})")
+            self._track_activity(session_key, session)
+            logger.info("🎤 Voice session started for U:%s in G:%s (channel: %s, ID: %s, participants: %s)",
+                        user_id, guild_id, after.channel.name, channel_id, participant_count)
 
             # Check for daily streak on new session
             user_data = await self.leveling_system.get_user_data(user_id, guild_id)
@@ -135,14 +317,13 @@ class VoiceLevelingSystem:
                     await self.leveling_system.update_user_data(
                         user_id, guild_id, {"$set": streak_update_data}
                     )
-                    logger.info(f"🔥 Daily streak updated to {new_streak} for U:{user_id} from voice activity.")
+                    logger.info("🔥 Daily streak updated to %s for U:%s from voice activity.", new_streak, user_id)
         else:
             # Existing session - user moved channels or reconnected
-            session = self.voice_sessions[session_key]
             # Update channel_id if user moved to a different channel
             new_channel_id = str(after.channel.id) if after.channel else None
             if session.channel_id != new_channel_id:
-                logger.debug(f"🚶 User moved channels: {session.channel_id} → {new_channel_id}")
+                logger.debug("🚶 User moved channels: %s → %s", session.channel_id, new_channel_id)
                 session.channel_id = new_channel_id
 
             session.set_state(
@@ -154,21 +335,35 @@ class VoiceLevelingSystem:
                 video=after.self_video,
                 update_time=current_time,
             )
-            logger.debug(f"🎤 Voice session updated for U:{user_id} in G:{guild_id}")
+            self._track_activity(session_key, session)
+            logger.debug("🎤 Voice session updated for U:%s in G:%s", user_id, guild_id)
 
-    async def _handle_voice_leave(self, session_key: Tuple[str, str], user_id: str, guild_id: str,
+    async def _handle_voice_leave(self, session_key: int, user_id: str, guild_id: str,
                                   current_time: float):
         """Handle user leaving a voice channel."""
-        if session_key in self.voice_sessions:
-            session = self.voice_sessions.pop(session_key)
-            logger.info(f"🎤 Voice session ended for U:{user_id} in G:{guild_id}")
+        session = self.voice_sessions.pop(session_key, None)
+        if session is not None:
+            logger.info("🎤 Voice session ended for U:%s in G:%s", user_id, guild_id)
             await self._process_session_rewards(user_id, guild_id, session, current_time)
+            self._session_pool.append(session)
+
+    def _track_activity(self, session_key: int, session: VoiceSession):
+        """Record the session's latest update time for the stale sweep."""
+        heapq.heappush(self._activity_heap, (session.last_update_time, session_key))
+
+    def _acquire_session(self, **fields) -> VoiceSession:
+        """Reuse a pooled session when one is available, otherwise build a new one."""
+        if self._session_pool:
+            session = self._session_pool.popleft()
+            session.reinit(**fields)
+            return session
+        return VoiceSession(**fields)
 
-    async def _handle_voice_state_change(self, session_key: Tuple[str, str], user_id: str, guild_id: str,
+    async def _handle_voice_state_change(self, session_key: int, user_id: str, guild_id: str,
                                          after: VoiceState, current_time: float):
         """Handle voice state changes within the same channel."""
-        if session_key in self.voice_sessions:
-            session = self.voice_sessions[session_key]
+        session = self.voice_sessions.get(session_key)
+        if session is not None:
             session.set_state(
                 muted=after.mute,
                 deafened=after.deaf,
@@ -178,17 +373,21 @@ class VoiceLevelingSystem:
                 video=after.self_video,
                 update_time=current_time,
             )
+            self._track_activity(session_key, session)
 
-            state_desc = session._get_state_description()
-            logger.debug(f"🎤 Voice state changed for U:{user_id}: {state_desc}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🎤 Voice state changed for U:%s: %s", user_id, session._get_state_description())
 
     async def _process_session_rewards(self, user_id: str, guild_id: str, session: VoiceSession, end_time: float):
         """
         Calculate and process rewards for a completed voice session.
         Integrated with main leveling system update structure.
+
+        end_time is on the session's monotonic clock; the stored timestamps
+        and period keys use the wall clock at the time rewards are processed.
         """
         try:
-            logger.info(f"💰 Processing voice rewards: G:{guild_id} U:{user_id}")
+            logger.info("💰 Processing voice rewards: G:%s U:%s", guild_id, user_id)
 
             # Finalize session metrics
             session.update_state_times(end_time)
@@ -197,51 +396,59 @@ class VoiceLevelingSystem:
 
             # Anti-cheat: Minimum duration check
             if active_seconds <= 10:
-                logger.info(f"🎤 Session too short ({active_seconds:.1f}s active). No rewards.")
+                logger.info("🎤 Session too short (%.1fs active). No rewards.", active_seconds)
                 return
 
             # Rate limiting check
             if not await self._check_voice_rate_limit(user_id, guild_id):
-                logger.warning(f"🚫 Voice rate limit exceeded: G:{guild_id} U:{user_id}")
+                logger.warning("🚫 Voice rate limit exceeded: G:%s U:%s", guild_id, user_id)
                 return
 
-            # Load settings and user data
-            settings = await self.leveling_system.get_guild_settings(guild_id)
-            user_data = await self.leveling_system.get_user_data(user_id, guild_id)
+            # Load settings and user data concurrently
+            (settings, config), user_data = await asyncio.gather(
+                self._get_settings(guild_id),
+                self.leveling_system.get_user_data(user_id, guild_id)
+            )
 
-            if not user_data:
-                logger.info(f"🆕 Creating new user profile for voice: U:{user_id}")
+            # A first-time user's profile is inserted by the stats write's upsert
+            new_profile = not user_data
+            if new_profile:
+                logger.info("🆕 Creating new user profile for voice: U:%s", user_id)
                 user_data = await self.leveling_system.create_enhanced_user_profile(user_id, guild_id)
 
+            wall_time = utc_now_ts()
+
             # Calculate rewards (with channel-specific bonuses)
             channel_id = session.channel_id
-            rewards = await self._calculate_voice_rewards(active_seconds, settings, user_data, metrics, channel_id)
+            rewards = await self._calculate_voice_rewards(active_seconds, config, user_data, metrics, channel_id)
 
-            # Apply voice caps (daily/weekly/monthly limits)
-            rewards = self._apply_voice_caps(rewards, user_data, settings)
+            # Apply voice caps (daily/weekly/monthly limits), if the guild has any
+            if config.cap_periods:
+                rewards = self._apply_voice_caps(rewards, user_data, config, wall_time)
 
-            if rewards["xp"] > 0 or rewards["embers"] > 0:
+            if rewards.xp > 0 or rewards.embers > 0:
                 result_data = await self._update_user_voice_stats(
-                    user_id, guild_id, rewards, metrics, user_data, settings
+                    user_id, guild_id, rewards, metrics, user_data, settings, wall_time,
+                    new_profile=new_profile
                 )
 
-                logger.info(f"💰 Voice rewards awarded: {rewards['xp']} XP, "
-                            f"{rewards['embers']} Embers for {active_seconds:.1f}s active")
+                logger.info("💰 Voice rewards awarded: %s XP, %s Embers for %.1fs active",
+                            rewards.xp, rewards.embers, active_seconds)
                 
                 # =================================================================
                 # Check for achievements
                 # =================================================================
-                if result_data and hasattr(self.leveling_system, 'achievement_system') and self.leveling_system.achievement_system:
+                if result_data and self._check_achievements is not None:
                     logger.debug("Checking for voice achievements...")
                     try:
                         activity_data = {
                             "type": "voice",
                             "metrics": metrics,
-                            "rewards": rewards,
+                            "rewards": rewards.to_dict(),
                             "leveled_up": result_data.get("leveled_up", False),
                             "new_level": result_data.get("level_up", {}).get("new_level")
                         }
-                        await self.leveling_system.achievement_system.check_and_update_achievements(
+                        await self._check_achievements(
                             user_id, guild_id, activity_data
                         )
                         logger.debug("✅ Voice achievements checked.")
@@ -251,9 +458,9 @@ class VoiceLevelingSystem:
         except Exception as e:
             logger.error(f"❌ Error processing voice rewards: {e}", exc_info=True)
 
-    async def _calculate_voice_rewards(self, active_seconds: float, settings: Dict[str, Any],
+    async def _calculate_voice_rewards(self, active_seconds: float, config: VoiceRewardConfig,
                                        user_data: Dict[str, Any], metrics: Dict[str, Any],
-                                       channel_id: str = None) -> Dict[str, float]:
+                                       channel_id: str = None) -> VoiceRewards:
         """
         Calculate voice rewards based on a variety of engagement factors.
 
@@ -269,19 +476,18 @@ class VoiceLevelingSystem:
 
         Args:
             active_seconds: The number of seconds the user was active in the session.
-            settings: The guild's leveling settings.
+            config: The guild's resolved voice reward settings.
             user_data: The user's current data, including level and streak.
             metrics: A dictionary of metrics from the VoiceSession.
             channel_id: The ID of the voice channel where the session took place.
 
         Returns:
-            A dictionary containing the calculated 'xp' and 'embers', along with
+            VoiceRewards with the calculated xp and embers, along with
             a breakdown of the multipliers that were applied.
         """
         try:
-            voice_cfg = settings.get("voice", {})
-            base_xp_per_min = voice_cfg.get("xp_per_min", 6)
-            base_embers_per_min = voice_cfg.get("embers_per_min", 4)
+            base_xp_per_min = config.xp_per_min
+            base_embers_per_min = config.embers_per_min
 
             active_minutes = active_seconds / 60.0
 
@@ -302,11 +508,11 @@ class VoiceLevelingSystem:
 
             # Channel-specific bonuses
             channel_multiplier = 1.0
-            channel_bonuses = voice_cfg.get("channel_bonuses", {})
+            channel_bonuses = config.channel_bonuses
             if channel_id and channel_id in channel_bonuses:
                 bonus = channel_bonuses[channel_id]
                 channel_multiplier = bonus
-                logger.debug(f"  • Channel bonus applied: {bonus}x (channel: {channel_id})")
+                logger.debug("  • Channel bonus applied: %sx (channel: %s)", bonus, channel_id)
 
             # Streaming/Video bonuses (based on time spent streaming/with camera)
             streaming_multiplier = 1.0
@@ -315,31 +521,30 @@ class VoiceLevelingSystem:
             # Apply screen share bonus if user was streaming during session
             streaming_time = metrics.get("streaming_time", 0)
             if streaming_time > 0:
-                screen_share_bonus = voice_cfg.get("screen_share_bonus", 1.0)
+                screen_share_bonus = config.screen_share_bonus
                 if screen_share_bonus > 1.0:
                     streaming_multiplier = screen_share_bonus
-                    logger.debug(f"  • Screen share bonus applied: {screen_share_bonus}x ({streaming_time:.1f}s streaming)")
+                    logger.debug("  • Screen share bonus applied: %sx (%.1fs streaming)", screen_share_bonus, streaming_time)
 
             # Apply camera bonus if user had video on during session
             video_time = metrics.get("video_time", 0)
             if video_time > 0:
-                camera_bonus = voice_cfg.get("camera_bonus", 1.0)
+                camera_bonus = config.camera_bonus
                 if camera_bonus > 1.0:
                     video_multiplier = camera_bonus
-                    logger.debug(f"  • Camera bonus applied: {camera_bonus}x ({video_time:.1f}s with camera)")
+                    logger.debug("  • Camera bonus applied: %sx (%.1fs with camera)", camera_bonus, video_time)
 
             # Participant count bonus (social bonus for populated channels)
             participant_multiplier = 1.0
             participant_count = metrics.get("participant_count", 0)
-            participant_bonus_enabled = voice_cfg.get("participant_bonus_enabled", False)
 
-            if participant_bonus_enabled and participant_count > 0:
+            if config.participant_bonus_enabled and participant_count > 0:
                 # Anti-exploit: Require minimum active time before applying participant bonus
-                min_time = voice_cfg.get("participant_min_time_seconds", 60)
+                min_time = config.participant_min_time_seconds
                 if active_seconds >= min_time:
-                    threshold = voice_cfg.get("participant_bonus_threshold", 3)
-                    bonus_per_person = voice_cfg.get("participant_bonus_per_person", 0.05)
-                    max_bonus = voice_cfg.get("participant_bonus_max", 1.5)
+                    threshold = config.participant_bonus_threshold
+                    bonus_per_person = config.participant_bonus_per_person
+                    max_bonus = config.participant_bonus_max
 
                     # Apply bonus if above threshold
                     if participant_count >= threshold:
@@ -347,38 +552,48 @@ class VoiceLevelingSystem:
                         additional_people = participant_count - threshold
                         calculated_bonus = 1.0 + (additional_people * bonus_per_person)
                         participant_multiplier = min(calculated_bonus, max_bonus)
-                        logger.debug(f"  • Participant bonus applied: {participant_multiplier:.2f}x "
-                                   f"({participant_count} members, {additional_people} above threshold)")
+                        logger.debug("  • Participant bonus applied: %.2fx (%s members, %s above threshold)",
+                                     participant_multiplier, participant_count, additional_people)
                     else:
-                        logger.debug(f"  • Participant count below threshold: {participant_count} < {threshold}")
+                        logger.debug("  • Participant count below threshold: %s < %s", participant_count, threshold)
                 else:
-                    logger.debug(f"  • Minimum time not met for participant bonus: "
-                               f"{active_seconds:.1f}s < {min_time}s")
+                    logger.debug("  • Minimum time not met for participant bonus: %.1fs < %ss",
+                                 active_seconds, min_time)
 
             # Calculate final rewards
-            calculated_xp = base_xp_per_min * active_minutes * engagement_multiplier * streak_bonus * level_multiplier * channel_multiplier * streaming_multiplier * video_multiplier * participant_multiplier
-            calculated_embers = base_embers_per_min * active_minutes * engagement_multiplier * streak_bonus * level_multiplier * channel_multiplier * streaming_multiplier * video_multiplier * participant_multiplier
+            combined_multiplier = (engagement_multiplier * streak_bonus * level_multiplier * channel_multiplier
+                                   * streaming_multiplier * video_multiplier * participant_multiplier)
+            calculated_xp = base_xp_per_min * active_minutes * combined_multiplier
+            calculated_embers = base_embers_per_min * active_minutes * combined_multiplier
+
+            if calculated_xp < MIN_REWARD_XP:
+                logger.debug("🎯 Voice reward below minimum (%.2f < %s XP), nothing awarded",
+                             calculated_xp, MIN_REWARD_XP)
+                return VoiceRewards()
 
             final_xp = max(1, round(calculated_xp))
             final_embers = max(1, round(calculated_embers))
 
-            logger.debug(f"🎯 Voice reward calculation:")
-            logger.debug(f"  • Base: {base_xp_per_min} XP/min, {base_embers_per_min} Embers/min")
-            logger.debug(f"  • Active time: {active_minutes:.1f} minutes")
-            if channel_id:
-                logger.debug(f"  • Channel: {channel_id}")
-            if participant_count > 0:
-                logger.debug(f"  • Participants: {participant_count} members")
-            logger.debug(f"  • Multipliers: engagement={engagement_multiplier:.2f}x, "
-                         f"streak={streak_bonus:.2f}x, level={level_multiplier:.2f}x, "
-                         f"channel={channel_multiplier:.2f}x, streaming={streaming_multiplier:.2f}x, "
-                         f"video={video_multiplier:.2f}x, participants={participant_multiplier:.2f}x")
-            logger.debug(f"  • Final: {final_xp} XP, {final_embers} Embers")
-
-            return {
-                "xp": float(final_xp),
-                "embers": float(final_embers),
-                "multipliers": {
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🎯 Voice reward calculation:")
+                logger.debug("  • Base: %s XP/min, %s Embers/min", base_xp_per_min, base_embers_per_min)
+                logger.debug("  • Active time: %.1f minutes", active_minutes)
+                if channel_id:
+                    logger.debug("  • Channel: %s", channel_id)
+                if participant_count > 0:
+                    logger.debug("  • Participants: %s members", participant_count)
+                logger.debug("  • Multipliers: engagement=%.2fx, streak=%.2fx, level=%.2fx, channel=%.2fx, "
+                             "streaming=%.2fx, video=%.2fx, participants=%.2fx",
+                             engagement_multiplier, streak_bonus, level_multiplier, channel_multiplier,
+                             streaming_multiplier, video_multiplier, participant_multiplier)
+                logger.debug("  • Final: %s XP, %s Embers", final_xp, final_embers)
+
+            return VoiceRewards(
+                xp=float(final_xp),
+                embers=float(final_embers),
+                original_xp=float(final_xp),
+                original_embers=float(final_embers),
+                multipliers={
                     "engagement": engagement_multiplier,
                     "streak": streak_bonus,
                     "level": level_multiplier,
@@ -387,14 +602,14 @@ class VoiceLevelingSystem:
                     "video": video_multiplier,
                     "participants": participant_multiplier
                 }
-            }
+            )
 
         except Exception as e:
             logger.error(f"❌ Voice reward calculation error: {e}")
-            return {"xp": 0.0, "embers": 0.0}
+            return VoiceRewards()
 
-    def _apply_voice_caps(self, rewards: Dict[str, float], user_data: Dict[str, Any],
-                          settings: Dict[str, Any]) -> Dict[str, float]:
+    def _apply_voice_caps(self, rewards: VoiceRewards, user_data: Dict[str, Any],
+                          config: VoiceRewardConfig, current_time: float) -> VoiceRewards:
         """
         Apply daily/weekly/monthly caps to voice rewards.
         Reduces rewards if they would exceed configured limits.
@@ -402,151 +617,89 @@ class VoiceLevelingSystem:
         Args:
             rewards: Calculated rewards before caps
             user_data: Current user data with existing totals
-            settings: Guild settings with cap configuration
+            config: Resolved voice settings carrying the configured caps
+            current_time: Session end timestamp, used to pick the current periods
 
         Returns:
             Adjusted rewards that respect caps
         """
         try:
-            voice_cfg = settings.get("voice", {})
             voice_stats = user_data.get("voice_stats", {})
 
-            # Get cap configuration
-            daily_caps = voice_cfg.get("daily_caps", {})
-            weekly_caps = voice_cfg.get("weekly_caps", {})
-            monthly_caps = voice_cfg.get("monthly_caps", {})
+            # Only the periods that actually have caps configured
+            periods = config.cap_periods
 
             # Skip if no caps configured
-            if not daily_caps and not weekly_caps and not monthly_caps:
+            if not periods:
                 logger.debug("  ⚙️ No voice caps configured, skipping cap check")
                 return rewards
 
             # Get current time keys
-            current_today_key = utc_today_key()
-            current_week_key = utc_week_key()
-            current_month_key = utc_month_key()
-
-            # Get stored time keys (for reset detection)
-            stored_today_key = voice_stats.get("today_key")
-            stored_week_key = voice_stats.get("week_key")
-            stored_month_key = voice_stats.get("month_key")
-
-            # Get current totals (reset if new period)
-            today_xp = voice_stats.get("today_xp", 0) if stored_today_key == current_today_key else 0
-            today_embers = voice_stats.get("today_embers", 0) if stored_today_key == current_today_key else 0
-
-            weekly_xp = voice_stats.get("weekly_xp", 0) if stored_week_key == current_week_key else 0
-            weekly_embers = voice_stats.get("weekly_embers", 0) if stored_week_key == current_week_key else 0
-
-            monthly_xp = voice_stats.get("monthly_xp", 0) if stored_month_key == current_month_key else 0
-            monthly_embers = voice_stats.get("monthly_embers", 0) if stored_month_key == current_month_key else 0
+            current_today_key, current_week_key, current_month_key = utc_period_keys(current_time)
+            current_keys = {"today_key": current_today_key, "week_key": current_week_key, "month_key": current_month_key}
 
             # Start with original rewards
-            final_xp = rewards.get("xp", 0)
-            final_embers = rewards.get("embers", 0)
+            final_xp = rewards.xp
+            final_embers = rewards.embers
             original_xp = final_xp
             original_embers = final_embers
 
             cap_applied = False
             cap_reasons = []
+            warn_enabled = logger.isEnabledFor(logging.INFO)
 
-            # Check daily caps
-            if daily_caps:
-                daily_xp_cap = daily_caps.get("xp", float('inf'))
-                daily_embers_cap = daily_caps.get("embers", float('inf'))
+            for label, xp_cap, embers_cap, window_field, xp_field, embers_field in periods:
+                # Get current totals (reset if new period)
+                in_period = voice_stats.get(window_field) == current_keys[window_field]
+                used_xp = voice_stats.get(xp_field, 0) if in_period else 0
+                used_embers = voice_stats.get(embers_field, 0) if in_period else 0
 
-                # Calculate remaining room
-                xp_room = max(0, daily_xp_cap - today_xp)
-                embers_room = max(0, daily_embers_cap - today_embers)
+                # Calculate remaining room and apply the cap if needed
+                xp_room = max(0, xp_cap - used_xp)
+                embers_room = max(0, embers_cap - used_embers)
 
-                # Apply cap if needed
                 if final_xp > xp_room:
                     final_xp = xp_room
                     cap_applied = True
-                    cap_reasons.append(f"daily XP cap ({daily_xp_cap})")
+                    cap_reasons.append(f"{label} XP cap ({xp_cap})")
 
                 if final_embers > embers_room:
                     final_embers = embers_room
                     cap_applied = True
-                    cap_reasons.append(f"daily Embers cap ({daily_embers_cap})")
+                    cap_reasons.append(f"{label} Embers cap ({embers_cap})")
 
                 # Warn when approaching cap (90%)
-                if today_xp + final_xp >= daily_xp_cap * 0.9 and today_xp < daily_xp_cap * 0.9:
-                    logger.info(f"  ⚠️ Approaching daily XP cap: {today_xp + final_xp:.0f}/{daily_xp_cap}")
-                if today_embers + final_embers >= daily_embers_cap * 0.9 and today_embers < daily_embers_cap * 0.9:
-                    logger.info(f"  ⚠️ Approaching daily Embers cap: {today_embers + final_embers:.0f}/{daily_embers_cap}")
-
-            # Check weekly caps
-            if weekly_caps:
-                weekly_xp_cap = weekly_caps.get("xp", float('inf'))
-                weekly_embers_cap = weekly_caps.get("embers", float('inf'))
-
-                xp_room = max(0, weekly_xp_cap - weekly_xp)
-                embers_room = max(0, weekly_embers_cap - weekly_embers)
-
-                if final_xp > xp_room:
-                    final_xp = min(final_xp, xp_room)
-                    cap_applied = True
-                    cap_reasons.append(f"weekly XP cap ({weekly_xp_cap})")
-
-                if final_embers > embers_room:
-                    final_embers = min(final_embers, embers_room)
-                    cap_applied = True
-                    cap_reasons.append(f"weekly Embers cap ({weekly_embers_cap})")
-
-                if weekly_xp + final_xp >= weekly_xp_cap * 0.9 and weekly_xp < weekly_xp_cap * 0.9:
-                    logger.info(f"  ⚠️ Approaching weekly XP cap: {weekly_xp + final_xp:.0f}/{weekly_xp_cap}")
-                if weekly_embers + final_embers >= weekly_embers_cap * 0.9 and weekly_embers < weekly_embers_cap * 0.9:
-                    logger.info(f"  ⚠️ Approaching weekly Embers cap: {weekly_embers + final_embers:.0f}/{weekly_embers_cap}")
-
-            # Check monthly caps
-            if monthly_caps:
-                monthly_xp_cap = monthly_caps.get("xp", float('inf'))
-                monthly_embers_cap = monthly_caps.get("embers", float('inf'))
-
-                xp_room = max(0, monthly_xp_cap - monthly_xp)
-                embers_room = max(0, monthly_embers_cap - monthly_embers)
-
-                if final_xp > xp_room:
-                    final_xp = min(final_xp, xp_room)
-                    cap_applied = True
-                    cap_reasons.append(f"monthly XP cap ({monthly_xp_cap})")
-
-                if final_embers > embers_room:
-                    final_embers = min(final_embers, embers_room)
-                    cap_applied = True
-                    cap_reasons.append(f"monthly Embers cap ({monthly_embers_cap})")
-
-                if monthly_xp + final_xp >= monthly_xp_cap * 0.9 and monthly_xp < monthly_xp_cap * 0.9:
-                    logger.info(f"  ⚠️ Approaching monthly XP cap: {monthly_xp + final_xp:.0f}/{monthly_xp_cap}")
-                if monthly_embers + final_embers >= monthly_embers_cap * 0.9 and monthly_embers < monthly_embers_cap * 0.9:
-                    logger.info(f"  ⚠️ Approaching monthly Embers cap: {monthly_embers + final_embers:.0f}/{monthly_embers_cap}")
+                if warn_enabled:
+                    if used_xp + final_xp >= xp_cap * 0.9 and used_xp < xp_cap * 0.9:
+                        logger.info("  ⚠️ Approaching %s XP cap: %.0f/%s", label, used_xp + final_xp, xp_cap)
+                    if used_embers + final_embers >= embers_cap * 0.9 and used_embers < embers_cap * 0.9:
+                        logger.info("  ⚠️ Approaching %s Embers cap: %.0f/%s", label, used_embers + final_embers, embers_cap)
 
             # Log if caps were applied
             if cap_applied:
                 reduction_xp = original_xp - final_xp
                 reduction_embers = original_embers - final_embers
-                logger.warning(f"  🚫 Voice rewards capped: XP {original_xp:.0f}→{final_xp:.0f} "
-                             f"(-{reduction_xp:.0f}), Embers {original_embers:.0f}→{final_embers:.0f} "
-                             f"(-{reduction_embers:.0f})")
-                logger.warning(f"  📊 Reason(s): {', '.join(cap_reasons)}")
+                logger.warning("  🚫 Voice rewards capped: XP %.0f→%.0f (-%.0f), Embers %.0f→%.0f (-%.0f)",
+                               original_xp, final_xp, reduction_xp, original_embers, final_embers, reduction_embers)
+                logger.warning("  📊 Reason(s): %s", ", ".join(cap_reasons))
 
             # Return adjusted rewards
-            return {
-                "xp": float(max(0, final_xp)),
-                "embers": float(max(0, final_embers)),
-                "multipliers": rewards.get("multipliers", {}),
-                "capped": cap_applied,
-                "original_xp": original_xp,
-                "original_embers": original_embers
-            }
+            return VoiceRewards(
+                xp=float(max(0, final_xp)),
+                embers=float(max(0, final_embers)),
+                multipliers=rewards.multipliers,
+                capped=cap_applied,
+                original_xp=original_xp,
+                original_embers=original_embers
+            )
 
         except Exception as e:
             logger.error(f"❌ Error applying voice caps: {e}", exc_info=True)
             return rewards  # Return original rewards on error
 
-    async def _update_user_voice_stats(self, user_id: str, guild_id: str, rewards: Dict[str, float],
-                                       metrics: Dict[str, Any], user_data: Dict[str, Any], settings: Dict[str, Any]):
+    async def _update_user_voice_stats(self, user_id: str, guild_id: str, rewards: VoiceRewards,
+                                       metrics: Dict[str, Any], user_data: Dict[str, Any], settings: Dict[str, Any],
+                                       current_time: float, new_profile: bool = False):
         """
         Update user statistics after a voice session and handle level-ups.
 
@@ -561,10 +714,13 @@ class VoiceLevelingSystem:
         Args:
             user_id: The ID of the user.
             guild_id: The ID of the guild.
-            rewards: A dictionary of capped XP and Ember rewards to be added.
+            rewards: The capped XP and Ember rewards to be added.
             metrics: A dictionary of metrics from the completed VoiceSession.
             user_data: The user's data before this update.
             settings: The guild's leveling settings.
+            current_time: Session end timestamp, used for timestamps and period keys.
+            new_profile: The user has no stored profile yet; the write upserts it
+                with the default profile fields.
 
         Returns:
             A dictionary containing the results of the update, including final
@@ -574,93 +730,58 @@ class VoiceLevelingSystem:
             current_xp = user_data.get("xp", 0)
             current_embers = user_data.get("embers", 0)
             current_level = user_data.get("level", 1)
+            reward_xp = rewards.xp
+            reward_embers = rewards.embers
 
             # Calculate new totals
-            new_xp = current_xp + rewards.get("xp", 0)
-            new_embers = current_embers + rewards.get("embers", 0)
+            new_xp = current_xp + reward_xp
+            new_embers = current_embers + reward_embers
 
             # Check for level up
             new_level, leveled_up = self.leveling_system.check_level_up(new_xp, current_level)
 
             # Prepare update data
-            now = utc_now_ts()
-            today_key = utc_today_key()
-            week_key = utc_week_key()
-            month_key = utc_month_key()
+            now = current_time
+            period_keys = utc_period_keys(current_time)
 
-            # Get stored time keys for reset detection
             voice_stats = user_data.get("voice_stats", {})
-            stored_today_key = voice_stats.get("today_key")
-            stored_week_key = voice_stats.get("week_key")
-            stored_month_key = voice_stats.get("month_key")
-
-            # Determine if we need to reset counters (new period)
-            reset_daily = stored_today_key != today_key
-            reset_weekly = stored_week_key != week_key
-            reset_monthly = stored_month_key != month_key
 
-            update_data = {
-                "$set": {
-                    "xp": new_xp,
-                    "embers": new_embers,
-                    "level": new_level,
-                    "updated_at": now,
-                    "last_rewarded.voice": now,
-                    "voice_stats.last_voice_activity": now,
-                    "voice_stats.today_key": today_key,
-                    "voice_stats.week_key": week_key,
-                    "voice_stats.month_key": month_key,
-                },
-                "$inc": {
-                    # Voice statistics
-                    "voice_stats.voice_seconds": metrics.get("voice_seconds", 0),
-                    "voice_stats.active_seconds": metrics.get("active_seconds", 0),
-                    "voice_stats.muted_time": metrics.get("muted_time", 0),
-                    "voice_stats.deafened_time": metrics.get("deafened_time", 0),
-                    "voice_stats.self_muted_time": metrics.get("self_muted_time", 0),
-                    "voice_stats.self_deafened_time": metrics.get("self_deafened_time", 0),
-                    "voice_stats.voice_sessions": 1,
-                }
+            inc_block = {inc_key: metrics.get(metric, 0) for metric, inc_key in _VOICE_METRIC_INC_KEYS}
+            inc_block["voice_stats.voice_sessions"] = 1
+            set_block = {
+                "xp": new_xp,
+                "embers": new_embers,
+                "level": new_level,
+                "updated_at": now,
+                "last_rewarded.voice": now,
+                "voice_stats.last_voice_activity": now,
             }
-
-            # Handle period resets and increments
-            if reset_daily:
-                logger.debug(f"  🔄 Daily reset detected ({stored_today_key} → {today_key})")
-                update_data["$set"]["voice_stats.today_xp"] = rewards.get("xp", 0)
-                update_data["$set"]["voice_stats.today_embers"] = rewards.get("embers", 0)
-            else:
-                update_data["$inc"]["voice_stats.today_xp"] = rewards.get("xp", 0)
-                update_data["$inc"]["voice_stats.today_embers"] = rewards.get("embers", 0)
-
-            if reset_weekly:
-                logger.debug(f"  🔄 Weekly reset detected ({stored_week_key} → {week_key})")
-                update_data["$set"]["voice_stats.weekly_xp"] = rewards.get("xp", 0)
-                update_data["$set"]["voice_stats.weekly_embers"] = rewards.get("embers", 0)
-            else:
-                update_data["$inc"]["voice_stats.weekly_xp"] = rewards.get("xp", 0)
-                update_data["$inc"]["voice_stats.weekly_embers"] = rewards.get("embers", 0)
-
-            if reset_monthly:
-                logger.debug(f"  🔄 Monthly reset detected ({stored_month_key} → {month_key})")
-                update_data["$set"]["voice_stats.monthly_xp"] = rewards.get("xp", 0)
-                update_data["$set"]["voice_stats.monthly_embers"] = rewards.get("embers", 0)
-            else:
-                update_data["$inc"]["voice_stats.monthly_xp"] = rewards.get("xp", 0)
-                update_data["$inc"]["voice_stats.monthly_embers"] = rewards.get("embers", 0)
+            update_data = {"$set": set_block, "$inc": inc_block}
+
+            # Handle period resets and increments; a stored key from an earlier period restarts the counters
+            for (label, window_field, key_path, xp_path, embers_path), current_key in zip(
+                    _VOICE_PERIOD_COUNTERS, period_keys):
+                set_block[key_path] = current_key
+                stored_key = voice_stats.get(window_field)
+                if stored_key != current_key:
+                    logger.debug("  🔄 %s reset detected (%s → %s)", label, stored_key, current_key)
+                    target = set_block
+                else:
+                    target = inc_block
+                target[xp_path] = reward_xp
+                target[embers_path] = reward_embers
 
             # Update session metrics
-            total_sessions = user_data.get("voice_stats", {}).get("voice_sessions", 0) + 1
-            total_active = user_data.get("voice_stats", {}).get("active_seconds", 0) + metrics.get("active_seconds", 0)
-
-            if total_sessions > 0:
-                update_data["$set"]["voice_stats.average_session_length"] = total_active / total_sessions
+            total_sessions = voice_stats.get("voice_sessions", 0) + 1
+            total_active = voice_stats.get("active_seconds", 0) + inc_block["voice_stats.active_seconds"]
+            set_block["voice_stats.average_session_length"] = total_active / total_sessions
 
             # Add level up information if applicable
             result_data = {
                 "status": "success",
                 "rewards": {
-                    "xp": rewards.get("xp", 0),
-                    "embers": rewards.get("embers", 0)
+                    "xp": reward_xp,
+                    "embers": reward_embers
                 },
                 "totals": {
                     "xp": new_xp,
@@ -669,7 +790,7 @@ class VoiceLevelingSystem:
                 },
                 "leveled_up": leveled_up,
                 "session_metrics": metrics,
-                "multipliers": rewards.get("multipliers", {})
+                "multipliers": rewards.multipliers
             }
 
             if leveled_up:
@@ -681,7 +802,7 @@ class VoiceLevelingSystem:
 
                 try:
                     # Check and update level roles
-                    logger.debug(f"🎭 Checking level roles for new level {new_level}")
+                    logger.debug("🎭 Checking level roles for new level %s", new_level)
                     role_result = await update_level_role_on_levelup(
                         bot=self.leveling_system.bot,
                         leveling_system=self.leveling_system,
@@ -699,11 +820,11 @@ class VoiceLevelingSystem:
                     elif role_result.error:
                         logger.warning(f"⚠️ Level role update failed: {role_result.error}")
                     else:
-                        logger.debug(f"ℹ️ Level roles: {role_result.reason}")
+                        logger.debug("ℹ️ Level roles: %s", role_result.reason)
 
                     # Send level-up message
                     if self.leveling_system.level_up_messages:
-                        guild_settings = await self.leveling_system.get_guild_settings(guild_id)
+                        guild_settings, _ = await self._get_settings(guild_id)
                         notification_channel = guild_settings.get("notification_channel")
 
                         if notification_channel:
@@ -728,7 +849,7 @@ class VoiceLevelingSystem:
                                     "roles_removed": [r.name for r in role_result.roles_removed]
                                 }
 
-                            logger.debug(f"📨 Attempting to send level-up message to channel {notification_channel}")
+                            logger.debug("📨 Attempting to send level-up message to channel %s", notification_channel)
                             success = await self.leveling_system.level_up_messages.send_level_up_message(
                                 guild_id=guild_id,
                                 user_id=user_id,
@@ -743,14 +864,19 @@ class VoiceLevelingSystem:
                             else:
                                 logger.warning(f"⚠️ Level-up message failed to send to channel {notification_channel}")
                         else:
-                            logger.debug(f"ℹ️ No notification channel configured for guild {guild_id}")
+                            logger.debug("ℹ️ No notification channel configured for guild %s", guild_id)
                     else:
                         logger.warning(f"⚠️ Level-up message handler not initialized")
                 except Exception as e:
                     logger.error(f"❌ Failed to send voice level-up message: {e}", exc_info=True)
 
-            await self.leveling_system.update_user_data(user_id, guild_id, update_data)
-            logger.debug(f"✅ Voice stats updated successfully: G:{guild_id} U:{user_id}")
+            if new_profile:
+                await self.leveling_system.bulk_update_user_data(
+                    [(user_id, guild_id, update_data)], create_missing=True
+                )
+            else:
+                await self.leveling_system.update_user_data(user_id, guild_id, update_data)
+            logger.debug("✅ Voice stats updated successfully: G:%s U:%s", guild_id, user_id)
 
             return result_data
 
@@ -761,18 +887,21 @@ class VoiceLevelingSystem:
     async def _check_voice_rate_limit(self, user_id: str, guild_id: str) -> bool:
         """Check voice activity rate limiting."""
         try:
-            current_hour = int(time.time() // 3600)
-            rate_limit_key = f"rate_limit:{guild_id}:{user_id}:voice:{current_hour}"
-            recent_count = await rate_limiter.get_rate_limit_count(rate_limit_key)
+            session_key = _session_key(guild_id, user_id)
+            prefix = self._rl_prefix.get(session_key)
+            if prefix is None:
+                if len(self._rl_prefix) >= RATE_LIMIT_PREFIX_CACHE_SIZE:
+                    self._rl_prefix.clear()
+                prefix = self._rl_prefix[session_key] = f"rate_limit:{guild_id}:{user_id}:voice:"
+            rate_limit_key = prefix + str(int(utc_now_ts() // 3600))
 
             # Limit to 10 voice sessions per hour
-            if recent_count >= 10:
+            if not await rate_limiter.check_and_increment(rate_limit_key, 10, 3600):
                 await self._log_anti_cheat_violation(
                     user_id, guild_id, "voice", "Rate limit exceeded"
                 )
                 return False
 
-            await rate_limiter.increment_rate_limit_count(rate_limit_key)
             return True
 
         except Exception as e:
@@ -783,60 +912,84 @@ class VoiceLevelingSystem:
         """Log anti-cheat violation."""
         logger.warning(f"🚫 Voice anti-cheat: U:{user_id} in G:{guild_id} - {reason}")
 
-    async def _periodic_cleanup(self):
-        """Periodically clean up stale voice sessions."""
-        try:
-            while True:
-                await asyncio.sleep(300)  # Run every 5 minutes
-                await self._cleanup_stale_sessions()
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"❌ Voice session cleanup error: {e}")
+    async def _maybe_sweep_stale_sessions(self, current_time: float):
+        """
+        Sweep stale sessions if the last sweep is older than the sweep interval.
 
-    async def _cleanup_stale_sessions(self):
+        Runs off incoming voice events instead of a background loop, so idle
+        shards don't wake the event loop just to find nothing to clean.
+        """
+        if current_time - self._last_stale_sweep < STALE_SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_stale_sweep = current_time
+        await self._cleanup_stale_sessions(current_time)
+
+    async def _cleanup_stale_sessions(self, current_time: float):
         """Clean up voice sessions that might have been missed due to disconnections."""
         try:
-            current_time = time.time()
-            stale_sessions = []
-
-            for session_key, session in self.voice_sessions.items():
-                guild_id, user_id = session_key
+            stale_sessions = self._take_stale_sessions(current_time)
 
-                # Consider sessions stale if no update in 10 minutes
-                if current_time - session.last_update_time > 600:
-                    stale_sessions.append((session_key, session))
-
-            for session_key, session in stale_sessions:
-                guild_id, user_id = session_key
-                logger.warning(f"🧹 Cleaning up stale voice session: G:{guild_id} U:{user_id}")
-
-                # Process rewards for the stale session
-                await self._process_session_rewards(user_id, guild_id, session, current_time)
-
-                # Remove from active sessions
-                if session_key in self.voice_sessions:
-                    del self.voice_sessions[session_key]
+            for session_key, _ in stale_sessions:
+                guild_id, user_id = _split_session_key(session_key)
+                logger.warning("🧹 Cleaning up stale voice session: G:%s U:%s", guild_id, user_id)
 
             if stale_sessions:
+                await self._process_ended_sessions(stale_sessions, current_time)
+                self._session_pool.extend(session for _, session in stale_sessions)
                 logger.info(f"🧹 Cleaned up {len(stale_sessions)} stale voice sessions")
 
         except Exception as e:
             logger.error(f"❌ Stale session cleanup error: {e}")
 
+    def _take_stale_sessions(self, current_time: float) -> List[Tuple[int, VoiceSession]]:
+        """
+        Remove and return the (session_key, session) pairs that have gone stale.
+
+        Synchronous on purpose: sessions leave the active map before the caller
+        awaits anything, so a concurrent leave can't process (and recycle) the
+        same session. Only heap entries older than the cutoff are visited.
+        """
+        cutoff = current_time - STALE_SESSION_SECONDS
+        heap = self._activity_heap
+        stale_sessions = []
+        while heap and heap[0][0] < cutoff:
+            update_time, session_key = heapq.heappop(heap)
+            session = self.voice_sessions.get(session_key)
+            if session is None:
+                continue  # Session already ended
+            if session.last_update_time != update_time:
+                # Updated since this entry; re-file it at its current time in
+                # case that update didn't add an entry of its own (e.g. a metrics read)
+                heapq.heappush(heap, (session.last_update_time, session_key))
+                continue
+            del self.voice_sessions[session_key]
+            stale_sessions.append((session_key, session))
+        return stale_sessions
+
+    async def _process_ended_sessions(self, ended_sessions, current_time: float):
+        """Process rewards for already-removed (session_key, session) pairs concurrently."""
+        tasks = []
+        for session_key, session in ended_sessions:
+            guild_id, user_id = _split_session_key(session_key)
+            tasks.append(self._process_session_rewards(user_id, guild_id, session, current_time))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for (session_key, _), result in zip(ended_sessions, results):
+            if isinstance(result, BaseException):
+                guild_id, user_id = _split_session_key(session_key)
+                logger.error(f"❌ Error processing ended voice session G:{guild_id} U:{user_id}: {result}")
+
     async def _cleanup_all_sessions(self):
         """Process all active sessions (used during shutdown)."""
         try:
-            current_time = time.time()
-            sessions_to_process = list(self.voice_sessions.items())
-
-            for session_key, session in sessions_to_process:
-                guild_id, user_id = session_key
-                logger.info(f"🔄 Processing remaining session during shutdown: G:{guild_id} U:{user_id}")
-                await self._process_session_rewards(user_id, guild_id, session, current_time)
+            current_time = time.monotonic()
+            # Swap in an empty map instead of copying the live one
+            sessions_to_process, self.voice_sessions = self.voice_sessions, {}
+            self._activity_heap = []
 
-            self.voice_sessions.clear()
-            logger.info(f"✅ Cleaned up {len(sessions_to_process)} active voice sessions")
+            logger.info("🔄 Processing %s remaining sessions during shutdown", len(sessions_to_process))
+            await self._process_ended_sessions(sessions_to_process.items(), current_time)
+            logger.info("✅ Cleaned up %s active voice sessions", len(sessions_to_process))
 
         except Exception as e:
             logger.error(f"❌ All sessions cleanup error: {e}")
@@ -849,33 +1002,49 @@ class VoiceLevelingSystem:
         try:
             logger.info("🔍 Performing startup voice check...")
 
+            current_time = time.monotonic()
             for guild in bot.guilds:
-                for voice_channel in guild.voice_channels:
-                    for member in voice_channel.members:
-                        if not member.bot:  # Ignore bots
-                            session_key = (str(guild.id), str(member.id))
-                            current_time = time.time()
-
-                            if session_key not in self.voice_sessions:
-                                session = VoiceSession(
-                                    start_time=current_time,
-                                    is_muted=member.voice.mute if member.voice else False,
-                                    is_deafened=member.voice.deaf if member.voice else False,
-                                    is_self_muted=member.voice.self_mute if member.voice else False,
-                                    is_self_deafened=member.voice.self_deaf if member.voice else False,
-                                )
-                                self.voice_sessions[session_key] = session
-                                logger.info(f"🎤 Startup: Voice session created for U:{member.id} in G:{guild.id}")
+                for session_key, session in self._scan_guild_voice(guild, current_time).items():
+                    self.voice_sessions[session_key] = session
+                    self._track_activity(session_key, session)
+                # Let other events through between guilds on large bots
+                await asyncio.sleep(0)
 
             logger.info(f"✅ Startup voice check complete. {len(self.voice_sessions)} active sessions found.")
 
         except Exception as e:
             logger.error(f"❌ Startup voice check failed: {e}")
 
+    def _scan_guild_voice(self, guild, current_time: float) -> Dict[int, VoiceSession]:
+        """Build sessions for the non-bot members already in one guild's voice channels."""
+        sessions = {}
+        for voice_channel in guild.voice_channels:
+            humans = [member for member in voice_channel.members if not member.bot]
+            channel_id = str(voice_channel.id)
+            for member in humans:
+                session_key = _session_key(guild.id, member.id)
+                if session_key in self.voice_sessions:
+                    continue
+
+                voice = member.voice
+                sessions[session_key] = VoiceSession(
+                    start_time=current_time,
+                    channel_id=channel_id,
+                    participant_count=len(humans),
+                    is_muted=voice.mute if voice else False,
+                    is_deafened=voice.deaf if voice else False,
+                    is_self_muted=voice.self_mute if voice else False,
+                    is_self_deafened=voice.self_deaf if voice else False,
+                    is_streaming=voice.self_stream if voice else False,
+                    is_video=voice.self_video if voice else False,
+                )
+                logger.info(f"🎤 Startup: Voice session created for U:{member.id} in G:{guild.id}")
+        return sessions
+
     def get_active_sessions_count(self) -> int:
         """Get count of currently active voice sessions."""
         return len(self.voice_sessions)
 
     def get_user_session(self, user_id: str, guild_id: str) -> Optional[VoiceSession]:
         """Get a user's current voice session if it exists."""
-        return self.voice_sessions.get((guild_id, user_id))
\ No newline at end of file
+        return self.voice_sessions.get(_session_key(guild_id, user_id))
\ No newline at end of file
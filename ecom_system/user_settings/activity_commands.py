@@ -2,11 +2,25 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
+from collections import defaultdict
 from database.EconDataManager import econ_db_manager
 from ecom_system.activity_system.activity_system import ActivitySystem
 
 logger = logging.getLogger(__name__)
 
+# Embed field templates, filled from the summary's activity_patterns
+_WEEKEND_VS_WEEKDAY_FMT = (
+    "**Weekend:** {weekend_percentage}% ({weekend_total} activities)\n"
+    "**Weekday:** {weekday_percentage}% ({weekday_total} activities)"
+)
+_TIME_OF_DAY_FMT = (
+    "**Morning (6-12):** {morning} activities\n"
+    "**Afternoon (12-18):** {afternoon} activities\n"
+    "**Evening (18-23):** {evening} activities\n"
+    "**Night (23-2):** {night} activities\n"
+    "**Overnight (2-6):** {overnight} activities"
+)
+
 class ActivityCommands(commands.Cog):
     """
     Cog for user-facing commands related to activity.
@@ -36,9 +50,11 @@ class ActivityCommands(commands.Cog):
         user_id = str(user.id)
         guild_id = str(interaction.guild.id)
 
-        summary = await activity_system.get_user_activity_summary(user_id, guild_id)
+        summary = await activity_system.load_user_activity_summary(user_id, guild_id)
 
-        if not summary:
+        # New profiles have a document but nothing to show yet
+        if (not summary or not summary.get("activity_patterns")
+                or not summary.get("activity_summary", {}).get("total_activities", 0)):
             await interaction.followup.send("No activity data found for this user.", ephemeral=True)
             return
 
@@ -46,55 +62,39 @@ class ActivityCommands(commands.Cog):
         await interaction.followup.send(embed=embed, ephemeral=True)
 
     def create_activity_embed(self, user: discord.Member, summary: dict) -> discord.Embed:
-        embed = discord.Embed(title=f"Activity Profile for {user.display_name}", color=user.color)
-        embed.set_thumbnail(url=user.display_avatar.url)
-
         # Time-based analysis
         patterns = summary.get("activity_patterns", {})
-        
+        fields = []
+
         # Weekend vs Weekday
         weekend_vs_weekday = patterns.get("weekend_vs_weekday")
         if weekend_vs_weekday:
-            embed.add_field(
-                name="Activity Preference",
-                value=(
-                    f"**Weekend:** {weekend_vs_weekday['weekend_percentage']}% "
-                    f"({weekend_vs_weekday['weekend_total']} activities)\n"
-                    f"**Weekday:** {weekend_vs_weekday['weekday_percentage']}% "
-                    f"({weekend_vs_weekday['weekday_total']} activities)"
-                ),
-                inline=False
-            )
+            fields.append({
+                "name": "Activity Preference",
+                "value": _WEEKEND_VS_WEEKDAY_FMT.format_map(weekend_vs_weekday),
+                "inline": False
+            })
 
         # Time of Day Breakdown
         time_of_day = patterns.get("time_of_day_breakdown")
         if time_of_day:
             by_period = time_of_day.get("by_period", {})
-            
-            value = (
-                f"**Morning (6-12):** {by_period.get('morning', 0)} activities\n"
-                f"**Afternoon (12-18):** {by_period.get('afternoon', 0)} activities\n"
-                f"**Evening (18-23):** {by_period.get('evening', 0)} activities\n"
-                f"**Night (23-2):** {by_period.get('night', 0)} activities\n"
-                f"**Overnight (2-6):** {by_period.get('overnight', 0)} activities"
-            )
-            embed.add_field(
-                name="Time of Day Breakdown",
-                value=value,
-                inline=False
-            )
-            if time_of_day.get("most_active_period"):
-                embed.add_field(
-                    name="Most Active",
-                    value=time_of_day['most_active_period'].capitalize(),
-                    inline=True
-                )
-            if time_of_day.get("least_active_period"):
-                embed.add_field(
-                    name="Least Active",
-                    value=time_of_day['least_active_period'].capitalize(),
-                    inline=True
-                )
+            fields.append({
+                "name": "Time of Day Breakdown",
+                "value": _TIME_OF_DAY_FMT.format_map(defaultdict(int, by_period)),
+                "inline": False
+            })
+            most_active_period = time_of_day.get("most_active_period")
+            if most_active_period:
+                fields.append({"name": "Most Active", "value": most_active_period.capitalize(), "inline": True})
+            least_active_period = time_of_day.get("least_active_period")
+            if least_active_period:
+                fields.append({"name": "Least Active", "value": least_active_period.capitalize(), "inline": True})
+
+        embed = discord.Embed(title=f"Activity Profile for {user.display_name}", color=user.color)
+        embed.set_thumbnail(url=user.display_avatar.url)
+        for field in fields:
+            embed.add_field(**field)
 
         return embed
 
@@ -1,12 +1,17 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
+from typing import Dict, Tuple
 
 from database.EconDataManager import econ_db_manager
 
 logger = logging.getLogger(__name__)
 
+# How long opt-in and cog unload wait for queued opt-out writes before giving up
+OPT_OUT_WAIT_SECONDS = 10
+
 
 # --- Modals and Views ---
 
@@ -20,47 +25,40 @@ class DeleteDataModal(discord.ui.Modal, title="Confirm Data Deletion"):
         max_length=6
     )
 
-    def __init__(self, user_id: str, guild_id: str):
+    def __init__(self, user_id: str, guild_id: str, submit_opt_out):
         super().__init__()
         self.user_id = user_id
         self.guild_id = guild_id
+        self.submit_opt_out = submit_opt_out
 
     async def on_submit(self, interaction: discord.Interaction):
         if self.confirm_text.value.lower() == 'delete':
-            await interaction.response.send_message("Processing your data deletion request...", ephemeral=True)
-            try:
-                await econ_db_manager.set_user_opt_out(self.user_id, self.guild_id, retain_data=False)
-                await interaction.edit_original_response(content="You have successfully opted out and all your data has been deleted.")
-                logger.warning(f"User {self.user_id} opted out and deleted their data in guild {self.guild_id}.")
-            except Exception as e:
-                await interaction.edit_original_response(content=f"An error occurred: {e}")
-                logger.error(f"Error during user data deletion for {self.user_id}: {e}")
+            # The deletion runs in the background; failures are reported back on this interaction
+            self.submit_opt_out(interaction, self.user_id, self.guild_id, retain_data=False)
+            await interaction.response.send_message(
+                "You have successfully opted out and your data is being deleted.", ephemeral=True
+            )
         else:
             await interaction.response.send_message("Incorrect confirmation text. Data deletion cancelled.", ephemeral=True)
 
 
 class OptOutView(discord.ui.View):
     """A view to handle the opt-out process."""
-    def __init__(self, user_id: str, guild_id: str):
+    def __init__(self, user_id: str, guild_id: str, submit_opt_out):
         super().__init__(timeout=60)
         self.user_id = user_id
         self.guild_id = guild_id
+        self.submit_opt_out = submit_opt_out
 
     @discord.ui.button(label="Retain Data (90 days)", style=discord.ButtonStyle.primary)
     async def retain_data(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
-        try:
-            await econ_db_manager.set_user_opt_out(self.user_id, self.guild_id, retain_data=True)
-            await interaction.followup.send("You have opted out. Your data will be automatically deleted in 90 days if you do not opt back in.", ephemeral=True)
-            logger.info(f"User {self.user_id} opted out in guild {self.guild_id} with data retention.")
-        except Exception as e:
-            await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
-            logger.error(f"Error during opt-out with retention for {self.user_id}: {e}")
+        self.submit_opt_out(interaction, self.user_id, self.guild_id, retain_data=True)
+        await interaction.response.send_message("You have opted out. Your data will be automatically deleted in 90 days if you do not opt back in.", ephemeral=True)
         self.stop()
 
     @discord.ui.button(label="Delete All My Data", style=discord.ButtonStyle.danger)
     async def delete_data(self, interaction: discord.Interaction, button: discord.ui.Button):
-        modal = DeleteDataModal(user_id=self.user_id, guild_id=self.guild_id)
+        modal = DeleteDataModal(user_id=self.user_id, guild_id=self.guild_id, submit_opt_out=self.submit_opt_out)
         await interaction.response.send_modal(modal)
         self.stop()
 
@@ -72,6 +70,58 @@ class UserSettingsCommands(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        # Opt-out writes queued by the views: (interaction, user_id, guild_id, retain_data, done)
+        self._opt_out_queue: asyncio.Queue = asyncio.Queue()
+        self._opt_out_worker = None
+        # (user_id, guild_id) -> future for that user's latest queued opt-out, resolved once written
+        self._pending_opt_outs: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def cog_load(self):
+        """Start the background writer for opt-out requests."""
+        self._opt_out_worker = asyncio.create_task(self._process_opt_outs())
+
+    async def cog_unload(self):
+        """Finish any queued opt-out writes, then stop the writer."""
+        if self._opt_out_worker_alive():
+            try:
+                await asyncio.wait_for(self._opt_out_queue.join(), timeout=OPT_OUT_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stopping the opt-out writer with {self._opt_out_queue.qsize()} writes still queued.")
+        if self._opt_out_worker:
+            self._opt_out_worker.cancel()
+
+    def _opt_out_worker_alive(self) -> bool:
+        """Whether the opt-out writer task is still running."""
+        return self._opt_out_worker is not None and not self._opt_out_worker.done()
+
+    def submit_opt_out(self, interaction: discord.Interaction, user_id: str, guild_id: str, retain_data: bool):
+        """Queue an opt-out write so the interaction can be answered without waiting on MongoDB."""
+        done = asyncio.get_running_loop().create_future()
+        self._pending_opt_outs[(user_id, guild_id)] = done
+        self._opt_out_queue.put_nowait((interaction, user_id, guild_id, retain_data, done))
+
+    async def _process_opt_outs(self):
+        """Apply queued opt-out writes one at a time, reporting failures back to the user."""
+        while True:
+            interaction, user_id, guild_id, retain_data, done = await self._opt_out_queue.get()
+            try:
+                await econ_db_manager.set_user_opt_out(user_id, guild_id, retain_data=retain_data)
+                if retain_data:
+                    logger.info(f"User {user_id} opted out in guild {guild_id} with data retention.")
+                else:
+                    logger.warning(f"User {user_id} opted out and deleted their data in guild {guild_id}.")
+            except Exception as e:
+                logger.error(f"Error during opt-out for {user_id} (retain_data={retain_data}): {e}")
+                try:
+                    await interaction.followup.send(f"An error occurred while opting you out: {e}", ephemeral=True)
+                except discord.HTTPException:
+                    pass
+            finally:
+                done.set_result(None)
+                # A newer opt-out from the same user keeps its own entry
+                if self._pending_opt_outs.get((user_id, guild_id)) is done:
+                    del self._pending_opt_outs[(user_id, guild_id)]
+                self._opt_out_queue.task_done()
 
     settings_group = app_commands.Group(name="settings", description="Manage your economy system settings.")
 
@@ -82,7 +132,9 @@ class UserSettingsCommands(commands.Cog):
             await interaction.response.send_message("You have already opted out.", ephemeral=True)
             return
 
-        view = OptOutView(user_id=str(interaction.user.id), guild_id=str(interaction.guild.id))
+        view = OptOutView(
+            user_id=str(interaction.user.id), guild_id=str(interaction.guild.id), submit_opt_out=self.submit_opt_out
+        )
         await interaction.response.send_message(
             "**You are about to opt out of the economy system.**\n\n"
             "Choosing **Retain Data** means we will hold your data for 90 days, after which it will be deleted if you don't opt back in.\n"
@@ -94,8 +146,19 @@ class UserSettingsCommands(commands.Cog):
     @settings_group.command(name="opt-in", description="Opt back into the economy system.")
     async def opt_in(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
+        user_id, guild_id = str(interaction.user.id), str(interaction.guild.id)
         try:
-            await econ_db_manager.set_user_opt_in(str(interaction.user.id), str(interaction.guild.id))
+            # Let this user's queued opt-out land first so it can't overwrite the opt-in
+            pending = self._pending_opt_outs.get((user_id, guild_id))
+            if pending is not None and self._opt_out_worker_alive():
+                try:
+                    await asyncio.wait_for(asyncio.shield(pending), timeout=OPT_OUT_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    await interaction.followup.send(
+                        "Your opt-out is still being processed. Please try opting in again in a moment.", ephemeral=True
+                    )
+                    return
+            await econ_db_manager.set_user_opt_in(user_id, guild_id)
             await interaction.followup.send("You have successfully opted back into the economy system!", ephemeral=True)
             logger.info(f"User {interaction.user.id} opted back in in guild {interaction.guild.id}.")
         except Exception as e:
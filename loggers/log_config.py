@@ -1,7 +1,9 @@
 import asyncio
+import atexit
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
 from dotenv import load_dotenv
 
@@ -17,6 +19,10 @@ def setup_logging(app_name: str, default_level=logging.INFO):
     a rotating file, and the email error reporter. All loggers in the
     application will inherit this configuration.
 
+    Console and file output go through a QueueHandler: logging calls on the
+    event loop only enqueue the record, and a QueueListener thread does the
+    formatting and I/O.
+
     Args:
         app_name: The name of the application, used for the log file.
         default_level: The fallback minimum level of logs to process if LOG_LEVEL env var is not set.
@@ -41,7 +47,6 @@ def setup_logging(app_name: str, default_level=logging.INFO):
     console_handler = logging.StreamHandler()
     console_format = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     console_handler.setFormatter(ColoredConsoleFormatter(console_format))
-    root_logger.addHandler(console_handler)
 
     # 4. Create a rotating file handler
     log_dir = "logs"
@@ -55,7 +60,13 @@ def setup_logging(app_name: str, default_level=logging.INFO):
     )
     file_format = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     file_handler.setFormatter(IndentedFormatter(file_format))
-    root_logger.addHandler(file_handler)
+
+    # 4b. Route console and file output through a queue drained by a background thread
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    queue_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    queue_listener.start()
+    atexit.register(queue_listener.stop)
 
     # 5. Create the email error reporter and its handler
     error_reporter = None
@@ -63,6 +74,7 @@ def setup_logging(app_name: str, default_level=logging.INFO):
         error_reporter = ErrorReporter(email=email, app_password=password)
         reporting_handler = ReportingHandler(notifier=error_reporter)
         reporting_handler.setLevel(logging.ERROR)  # Only send ERROR and CRITICAL to email
+        # Attached directly (not queued): the reporter schedules alerts on the running event loop
         root_logger.addHandler(reporting_handler)
         logging.info("Error reporter initialized and handler added.")
     else:
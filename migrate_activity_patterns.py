@@ -10,7 +10,7 @@ Usage:
     python migrate_activity_patterns.py --dry-run
 
     # Actually migrate:
-    python migrate_activity_patterns.py
+    python migrate_activity_patterns.py --yes
 """
 
 import asyncio
@@ -71,7 +71,7 @@ async def main(dry_run: bool = True):
         if dry_run and stats.get('documents_needing_migration', 0) > 0:
             print("=" * 70)
             print("This was a dry run. To actually migrate the data, run:")
-            print("  python migrate_activity_patterns.py")
+            print("  python migrate_activity_patterns.py --yes")
             print("=" * 70)
         elif not dry_run:
             print("=" * 70)
@@ -100,19 +100,20 @@ if __name__ == "__main__":
         default=False,
         help="Run in dry-run mode (no changes will be made)"
     )
+    parser.add_argument(
+        "--yes", "-y",
+        action="store_true",
+        default=False,
+        help="Confirm a live migration (required unless --dry-run is given)"
+    )
 
     args = parser.parse_args()
 
-    # If no --dry-run flag, default to dry run and require explicit confirmation
-    if not args.dry_run:
-        print("WARNING: This will modify your database!")
-        confirm = input("Are you sure you want to proceed? (yes/no): ")
-        if confirm.lower() != "yes":
-            print("Migration cancelled.")
-            sys.exit(0)
-        dry_run = False
-    else:
-        dry_run = True
+    # A live run modifies the database, so it must be confirmed explicitly
+    if not args.dry_run and not args.yes:
+        print("Refusing to modify the database without --yes. Use --dry-run to preview changes.", file=sys.stderr)
+        sys.exit(2)
+    dry_run = args.dry_run
 
     exit_code = asyncio.run(main(dry_run=dry_run))
     sys.exit(exit_code)
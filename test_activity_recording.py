@@ -9,6 +9,8 @@ import time
 from database.DatabaseManager import DatabaseManager
 from ecom_system.activity_system.activity_system import ActivitySystem
 
+CONCURRENT_ACTIVITIES = 10
+
 
 async def test_activity_recording():
     """Test that activity recording doesn't cause WriteError."""
@@ -36,7 +38,7 @@ async def test_activity_recording():
         test_user_id = f"test_user_{int(time.time())}"
         test_guild_id = "1265120128295632926"
 
-        print(f"3. Recording message activity for NEW user: {test_user_id}")
+        print(f"3. Recording {CONCURRENT_ACTIVITIES} message activities for NEW user: {test_user_id}")
         activity_data = {
             "channel_id": "1265122713639583824",
             "channel_name": "test-channel",
@@ -48,28 +50,22 @@ async def test_activity_recording():
             "has_embeds": False
         }
 
-        await activity_system.record_activity(
-            user_id=test_user_id,
-            guild_id=test_guild_id,
-            activity_type="message",
-            activity_data=activity_data
-        )
-        print("   ✓ First activity recorded successfully!")
-        print()
-
-        # Record another activity to test incrementing existing arrays
-        print("4. Recording second message activity...")
-        await activity_system.record_activity(
-            user_id=test_user_id,
-            guild_id=test_guild_id,
-            activity_type="message",
-            activity_data=activity_data
-        )
-        print("   ✓ Second activity recorded successfully!")
+        # Record concurrently so the first-insert upsert races against itself and
+        # later increments land on the arrays it creates
+        await asyncio.gather(*(
+            activity_system.record_activity(
+                user_id=test_user_id,
+                guild_id=test_guild_id,
+                activity_type="message",
+                activity_data=activity_data
+            )
+            for _ in range(CONCURRENT_ACTIVITIES)
+        ))
+        print(f"   ✓ {CONCURRENT_ACTIVITIES} concurrent activities recorded successfully!")
         print()
 
         # Verify the data structure
-        print("5. Verifying data structure...")
+        print("4. Verifying data structure...")
         user_data = await activity_system.get_user_activity_summary(test_user_id, test_guild_id)
 
         if user_data:
@@ -92,7 +88,11 @@ async def test_activity_recording():
             else:
                 print("   ✗ Weekly pattern is WRONG format!")
 
-            print(f"\n   Total activities: {user_data.get('activity_summary', {}).get('total_activities', 0)}")
+            total_activities = user_data.get('activity_summary', {}).get('total_activities', 0)
+            print(f"\n   Total activities: {total_activities}")
+            assert total_activities == CONCURRENT_ACTIVITIES, (
+                f"expected {CONCURRENT_ACTIVITIES} activities, got {total_activities}"
+            )
         else:
             print("   ✗ Could not retrieve user data!")
 
@@ -0,0 +1,143 @@
+"""
+Test script for message reward processing.
+
+Runs MessageLevelingSystem.process_rewards against a LevelingSystem backed by an
+in-memory stand-in for the Users collection, so no bot or database access is needed.
+"""
+
+import asyncio
+import copy
+import math
+import sys
+
+sys.path.append('.')
+
+from ecom_system.leveling.leveling import LevelingSystem
+from ecom_system.leveling.sub_system.messages import MAX_TABULATED_LENGTH, MessageLevelingSystem, MessageRewardConfig
+
+
+CAPPED_SETTINGS = {
+    "message": {
+        "daily_caps": {"xp": 100, "embers": 50},
+    }
+}
+
+
+class FakeUsersCollection:
+    """Keeps user documents in memory; pipeline updates are recorded, not evaluated."""
+
+    def __init__(self):
+        self.documents = {}
+        self.pipelines = []
+
+    async def find_one_and_update(self, query, pipeline, projection=None, return_document=None):
+        document = self.documents.get((query["user_id"], query["guild_id"]))
+        if document is None:
+            return None
+        self.pipelines.append(pipeline)
+        return copy.deepcopy(document)
+
+    async def update_one(self, query, update, upsert=False):
+        key = (query["user_id"], query["guild_id"])
+        if key not in self.documents and upsert:
+            self.documents[key] = dict(query, **update.get("$setOnInsert", {}))
+
+
+def _make_systems():
+    leveling_system = LevelingSystem.__new__(LevelingSystem)
+    leveling_system.users = FakeUsersCollection()
+    leveling_system.bot = None
+    return leveling_system, MessageLevelingSystem(leveling_system)
+
+
+def test_first_capped_message_creates_profile():
+    """A user's first message in a guild with caps gets a profile and is rewarded."""
+    leveling_system, message_system = _make_systems()
+
+    async def first_message():
+        user_data = await leveling_system.create_enhanced_user_profile("1", "10")
+        return await message_system.process_rewards(
+            "1", "10", {"xp": 20, "embers": 5}, user_data, CAPPED_SETTINGS, channel_id="5"
+        )
+
+    result = asyncio.run(first_message())
+
+    assert result is not None
+    assert result["rewards"] == {"xp": 20, "embers": 5}
+    profile = leveling_system.users.documents[("1", "10")]
+    assert profile["level"] == 1 and profile["xp"] == 0  # Defaults seeded before the update
+    assert len(leveling_system.users.pipelines) == 1
+
+
+def test_capped_message_for_existing_profile():
+    """An existing profile gets the pipeline update directly, with no profile insert."""
+    leveling_system, message_system = _make_systems()
+
+    async def message():
+        user_data = await leveling_system.create_enhanced_user_profile("1", "10")
+        user_data["xp"] = 40
+        leveling_system.users.documents[("1", "10")] = user_data
+        return await message_system.process_rewards(
+            "1", "10", {"xp": 20, "embers": 5}, user_data, CAPPED_SETTINGS, channel_id="5"
+        )
+
+    result = asyncio.run(message())
+
+    assert result["totals"]["xp"] == 60
+    assert len(leveling_system.users.documents) == 1
+    assert len(leveling_system.users.pipelines) == 1
+
+
+def _evaluate(expression, document):
+    """Evaluate the aggregation operators level_for_xp_expression uses against a document."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return document[expression[1:]]
+    if not isinstance(expression, dict):
+        return expression
+    (operator, operand), = expression.items()
+    if operator == "$toInt":
+        return int(_evaluate(operand, document))
+    if operator == "$floor":
+        return float(math.floor(_evaluate(operand, document)))
+    if operator == "$sqrt":
+        return math.sqrt(_evaluate(operand, document))
+    left, right = (_evaluate(argument, document) for argument in operand)
+    if operator == "$add":
+        return left + right
+    if operator == "$subtract":
+        return left - right
+    if operator == "$divide":
+        return left / right
+    raise ValueError(f"Unsupported operator {operator}")
+
+
+def test_level_expression_matches_check_level_up():
+    """The pipeline-derived level is an int equal to the level check_level_up gives for the same XP."""
+    leveling_system, _ = _make_systems()
+    level_expression = leveling_system.level_for_xp_expression("$xp")
+
+    for xp in (0, 99, 100, 299, 300, 5499, 5500, 6599, 6600, 1_234_567):
+        level = _evaluate(level_expression, {"xp": xp})
+        expected_level, _ = leveling_system.check_level_up(xp, 0)
+        assert type(level) is int
+        assert level == expected_level, xp
+
+
+def test_length_factor_with_float_and_large_max_length():
+    """A max_length stored as a double works, and a huge one doesn't build a huge table."""
+    config = MessageRewardConfig.from_settings({"message": {"max_length": 1200.0}})
+    assert config.length_factor(100) == 1.0
+    assert config.length_factor(650) == 1.25
+    assert config.length_factor(5000) == 1.5
+
+    config = MessageRewardConfig.from_settings({"message": {"max_length": 10_000_100}})
+    assert len(config.length_factor_table) == MAX_TABULATED_LENGTH + 1
+    assert config.length_factor(5_000_100) == 1.25
+
+
+if __name__ == "__main__":
+    test_first_capped_message_creates_profile()
+    test_capped_message_for_existing_profile()
+    test_level_expression_matches_check_level_up()
+    test_length_factor_with_float_and_large_max_length()
+    print("[SUCCESS] All tests passed!")
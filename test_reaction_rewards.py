@@ -0,0 +1,151 @@
+"""
+Test script for reaction reward dispatch.
+
+Runs ReactionLevelingSystem.process_reaction against an in-memory stand-in for
+the LevelingSystem, so no bot or database access is needed.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.append('.')
+
+from ecom_system.leveling.sub_system.reactions import ReactionLevelingSystem
+
+
+REACTION_SETTINGS = {
+    "reaction": {
+        "enabled": True,
+        "self_reaction_disabled": True,
+        "reactor": {"xp": 2, "embers": 1, "cooldown_seconds": 60},
+        "owner": {"xp": 4, "embers": 2, "cooldown_seconds": 60},
+        "chain_bonus": 1.5,
+    }
+}
+
+
+class FakeSettingsCollection:
+    """Minimal async stand-in for the reaction settings collection."""
+
+    def __init__(self, document):
+        self.document = document
+
+    async def find_one(self, query, *args, **kwargs):
+        return self.document
+
+
+class FakeLevelingSystem:
+    """Records user updates instead of writing them to MongoDB."""
+
+    def __init__(self, settings=None, last_rewarded=None):
+        self.ls_reaction = FakeSettingsCollection(settings)
+        self.last_rewarded = last_rewarded or {}
+        self.updates = []
+
+    async def get_user_reward_view(self, user_id, guild_id, extra_fields=None):
+        return {"user_id": user_id, "guild_id": guild_id, "last_rewarded": dict(self.last_rewarded)}
+
+    async def bulk_update_user_data(self, updates, create_missing=False):
+        for user_id, guild_id, update_data in updates:
+            self.updates.append((user_id, update_data))
+
+
+def _make_reaction(owner_id=2, count=2):
+    guild = SimpleNamespace(id=100)
+    owner = SimpleNamespace(id=owner_id, bot=False)
+    message = SimpleNamespace(
+        guild=guild,
+        author=owner,
+        created_at=datetime.now(timezone.utc),
+        reactions=[object()]
+    )
+    return SimpleNamespace(message=message, emoji="👍", count=count)
+
+
+def _updates_for(leveling_system, user_id):
+    return [update for uid, update in leveling_system.updates if uid == user_id]
+
+
+def test_owner_rewards_dispatched():
+    """The message owner's update must be written, including their XP reward."""
+    leveling_system = FakeLevelingSystem(REACTION_SETTINGS)
+    reaction_system = ReactionLevelingSystem(leveling_system)
+    reactor = SimpleNamespace(id=1, bot=False)
+
+    asyncio.run(reaction_system.process_reaction(_make_reaction(), reactor))
+
+    owner_updates = _updates_for(leveling_system, "2")
+    assert len(owner_updates) == 1
+    assert owner_updates[0]["$inc"]["message_stats.got_reactions"] == 1
+    assert owner_updates[0]["$inc"]["xp"] == 6  # 4 XP * 1.5 chain bonus
+    assert "last_rewarded.got_reaction" in owner_updates[0]["$set"]
+
+    reactor_updates = _updates_for(leveling_system, "1")
+    assert len(reactor_updates) == 1
+    assert reactor_updates[0]["$inc"]["message_stats.reacted_messages"] == 1
+
+
+def test_self_reaction_ignored():
+    """Reacting to your own message does not touch either profile."""
+    leveling_system = FakeLevelingSystem(REACTION_SETTINGS)
+    reaction_system = ReactionLevelingSystem(leveling_system)
+    reactor = SimpleNamespace(id=2, bot=False)
+
+    asyncio.run(reaction_system.process_reaction(_make_reaction(owner_id=2), reactor))
+
+    assert leveling_system.updates == []
+
+
+def test_cooldown_only_counts_reactions():
+    """Users still on cooldown get their counters bumped but no rewards."""
+    now = datetime.now(timezone.utc).timestamp()
+    leveling_system = FakeLevelingSystem(
+        REACTION_SETTINGS, last_rewarded={"give_reaction": now, "got_reaction": now}
+    )
+    reaction_system = ReactionLevelingSystem(leveling_system)
+    reactor = SimpleNamespace(id=1, bot=False)
+
+    asyncio.run(reaction_system.process_reaction(_make_reaction(), reactor))
+
+    assert _updates_for(leveling_system, "1") == [{"$inc": {"message_stats.reacted_messages": 1}}]
+    assert _updates_for(leveling_system, "2") == [{"$inc": {"message_stats.got_reactions": 1}}]
+
+
+def test_disabled_rewards_only_count_reactions():
+    """With rewards disabled both counters are bumped without any XP."""
+    settings = {"reaction": dict(REACTION_SETTINGS["reaction"], enabled=False)}
+    leveling_system = FakeLevelingSystem(settings)
+    reaction_system = ReactionLevelingSystem(leveling_system)
+    reactor = SimpleNamespace(id=1, bot=False)
+
+    asyncio.run(reaction_system.process_reaction(_make_reaction(), reactor))
+
+    assert _updates_for(leveling_system, "1") == [{"$inc": {"message_stats.reacted_messages": 1}}]
+    assert _updates_for(leveling_system, "2") == [{"$inc": {"message_stats.got_reactions": 1}}]
+
+
+def test_fractional_base_rewards_not_truncated():
+    """Fractional base rewards are multiplied before rounding, not truncated first."""
+    settings = {"reaction": dict(
+        REACTION_SETTINGS["reaction"], owner={"xp": 2.5, "embers": 1.5, "cooldown_seconds": 60}
+    )}
+    leveling_system = FakeLevelingSystem(settings)
+    reaction_system = ReactionLevelingSystem(leveling_system)
+    reactor = SimpleNamespace(id=1, bot=False)
+
+    asyncio.run(reaction_system.process_reaction(_make_reaction(), reactor))
+
+    owner_update = _updates_for(leveling_system, "2")[0]
+    assert owner_update["$inc"]["xp"] == 4  # 2.5 XP * 1.5 chain bonus = 3.75
+    assert owner_update["$inc"]["embers"] == 2  # 1.5 * 1.5 = 2.25
+
+
+if __name__ == "__main__":
+    test_owner_rewards_dispatched()
+    test_self_reaction_ignored()
+    test_cooldown_only_counts_reactions()
+    test_disabled_rewards_only_count_reactions()
+    test_fractional_base_rewards_not_truncated()
+    print("[SUCCESS] All tests passed!")
@@ -0,0 +1,115 @@
+"""
+Test script for voice session bookkeeping.
+
+Drives VoiceLevelingSystem against an in-memory stand-in for the
+LevelingSystem, so no bot or database access is needed.
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append('.')
+
+from ecom_system.leveling.sub_system.voice import VoiceLevelingSystem, STALE_SESSION_SECONDS, _session_key
+from ecom_system.Listeners.VoiceSessions import VoiceSession
+
+
+class FakeLevelingSystem:
+    """Records user updates instead of writing them to MongoDB."""
+
+    def __init__(self, user_data=None):
+        self.user_data = user_data
+        self.updates = []
+
+    async def get_user_data(self, user_id, guild_id):
+        return self.user_data
+
+    async def update_user_data(self, user_id, guild_id, update_data):
+        self.updates.append((user_id, update_data))
+
+
+def _voice_state(channel):
+    return SimpleNamespace(
+        channel=channel, mute=False, deaf=False, self_mute=False,
+        self_deaf=False, self_stream=False, self_video=False
+    )
+
+
+def _add_session(voice_system, guild_id, user_id, last_update_time):
+    session_key = _session_key(guild_id, user_id)
+    session = VoiceSession(start_time=last_update_time)
+    voice_system.voice_sessions[session_key] = session
+    voice_system._track_activity(session_key, session)
+    return session_key, session
+
+
+def test_stale_sweep_processes_each_session_once():
+    """Only sessions idle past the cutoff are processed, and they leave the active map first."""
+    voice_system = VoiceLevelingSystem(FakeLevelingSystem())
+    processed = []
+
+    async def record(user_id, guild_id, session, end_time):
+        # The session must already be gone, so a concurrent leave can't process it too
+        assert _session_key(guild_id, user_id) not in voice_system.voice_sessions
+        processed.append(user_id)
+
+    voice_system._process_session_rewards = record
+    now = time.monotonic()
+    _add_session(voice_system, "10", "1", now - STALE_SESSION_SECONDS - 60)
+    fresh_key, _ = _add_session(voice_system, "10", "2", now - 5)
+
+    asyncio.run(voice_system._cleanup_stale_sessions(now))
+    asyncio.run(voice_system._cleanup_stale_sessions(now))
+
+    assert processed == ["1"]
+    assert list(voice_system.voice_sessions) == [fresh_key]
+
+
+def test_stale_sweep_keeps_recreated_session():
+    """A session re-created under the same key after going idle is not swept with the old entry."""
+    voice_system = VoiceLevelingSystem(FakeLevelingSystem())
+    processed = []
+
+    async def record(user_id, guild_id, session, end_time):
+        processed.append(user_id)
+
+    voice_system._process_session_rewards = record
+    now = time.monotonic()
+    session_key, _ = _add_session(voice_system, "10", "1", now - STALE_SESSION_SECONDS - 60)
+    # The user left and rejoined; the old heap entry is still queued
+    replacement = VoiceSession(start_time=now - 5)
+    voice_system.voice_sessions[session_key] = replacement
+    voice_system._track_activity(session_key, replacement)
+
+    asyncio.run(voice_system._cleanup_stale_sessions(now))
+
+    assert processed == []
+    assert voice_system.voice_sessions[session_key] is replacement
+
+
+def test_streak_written_on_join():
+    """A streak bump is written when the session starts, so a short session still keeps it."""
+    leveling_system = FakeLevelingSystem(user_data={"daily_streak": {"count": 0, "timestamp": 0}})
+    voice_system = VoiceLevelingSystem(leveling_system)
+    channel = SimpleNamespace(id=5, name="general", members=[SimpleNamespace(bot=False)])
+
+    async def join_and_leave():
+        await voice_system.process_voice_state_update("1", "10", _voice_state(None), _voice_state(channel))
+        assert len(leveling_system.updates) == 1
+        await voice_system.process_voice_state_update("1", "10", _voice_state(channel), _voice_state(None))
+
+    asyncio.run(join_and_leave())
+
+    assert len(leveling_system.updates) == 1  # The session was too short to earn rewards
+    user_id, update = leveling_system.updates[0]
+    assert user_id == "1"
+    assert update["$set"]["daily_streak.count"] == 1
+
+
+if __name__ == "__main__":
+    test_stale_sweep_processes_each_session_once()
+    test_stale_sweep_keeps_recreated_session()
+    test_streak_written_on_join()
+    print("[SUCCESS] All tests passed!")